@@ -10,6 +10,14 @@ def _val(v, default="—") -> str:
     return str(v) if v is not None else default
 
 
+# Ruled section headers, precomposed as single list elements: one append
+# instead of the blank-line/rule/title/rule quartet at every call site.
+_SEP = "━━━━━━━━━━━━━━━"
+_VOCAB_SECTION = f"\n{_SEP}\n📚 <b>Слова</b>\n{_SEP}"
+_CONSTR_SECTION = f"\n{_SEP}\n🧩 <b>Конструкции</b>\n{_SEP}"
+_RECENT_SECTION = f"\n{_SEP}\n🕐 <b>Последние результаты</b>\n{_SEP}"
+
+
 # ── Scenario display ────────────────────────────────────
 
 def format_scenario(
@@ -23,10 +31,7 @@ def format_scenario(
         f"🗣 <b>{_esc(topic)}</b>",
         "",
         f"<i>{_esc(scenario)}</i>",
-        "",
-        "━━━━━━━━━━━━━━━",
-        "📚 <b>Слова</b>",
-        "━━━━━━━━━━━━━━━",
+        _VOCAB_SECTION,
     ]
 
     for w in vocabulary:
@@ -38,10 +43,7 @@ def format_scenario(
             lines.append(f"    <i>{example}</i>")
 
     if constructions:
-        lines.append("")
-        lines.append("━━━━━━━━━━━━━━━")
-        lines.append("🧩 <b>Конструкции</b>")
-        lines.append("━━━━━━━━━━━━━━━")
+        lines.append(_CONSTR_SECTION)
         for c in constructions:
             english = _esc(c.get("english", ""))
             russian = _esc(c.get("russian", ""))
@@ -61,46 +63,43 @@ def format_assessment(data: dict) -> str:
     if "error" in data:
         return f"⚠️ {_esc(data['error'])}"
 
-    lines = []
-
-    # Praise
-    praise = data.get("praise", "")
-    if praise:
-        lines.append(f"👏 {_esc(praise)}")
-        lines.append("")
-
-    # Mistakes
-    mistakes = data.get("mistakes", [])
-    if mistakes:
-        lines.append("✏️ <b>Обрати внимание:</b>")
-        for m in mistakes:
-            said = _esc(m.get("said", ""))
-            correction = _esc(m.get("correction", ""))
-            note = _esc(m.get("note", ""))
-            lines.append(f"  • <s>{said}</s> → <b>{correction}</b>")
-            if note:
-                lines.append(f"    <i>{note}</i>")
-        lines.append("")
-
-    # Suggestions
-    suggestions = data.get("suggestions", [])
-    if suggestions:
-        lines.append("💡 <b>Слова на заметку:</b>")
-        for s in suggestions:
-            if isinstance(s, dict):
-                word = _esc(s.get("word", ""))
-                translation = _esc(s.get("translation", ""))
-                lines.append(f"  • <b>{word}</b> — {translation}")
-            else:
-                lines.append(f"  • {_esc(str(s))}")
-        lines.append("")
-
-    # Feedback
-    feedback = data.get("feedback_text", "")
-    if feedback:
-        lines.append(f"💬 {_esc(feedback)}")
-
-    return "\n".join(lines)
+    # Yield lines instead of growing a list — join drains the generator
+    # in one pass with no intermediate reallocations.
+    def _gen():
+        praise = data.get("praise", "")
+        if praise:
+            yield f"👏 {_esc(praise)}"
+            yield ""
+
+        mistakes = data.get("mistakes", [])
+        if mistakes:
+            yield "✏️ <b>Обрати внимание:</b>"
+            for m in mistakes:
+                said = _esc(m.get("said", ""))
+                correction = _esc(m.get("correction", ""))
+                note = _esc(m.get("note", ""))
+                yield f"  • <s>{said}</s> → <b>{correction}</b>"
+                if note:
+                    yield f"    <i>{note}</i>"
+            yield ""
+
+        suggestions = data.get("suggestions", [])
+        if suggestions:
+            yield "💡 <b>Слова на заметку:</b>"
+            for s in suggestions:
+                if isinstance(s, dict):
+                    word = _esc(s.get("word", ""))
+                    translation = _esc(s.get("translation", ""))
+                    yield f"  • <b>{word}</b> — {translation}"
+                else:
+                    yield f"  • {_esc(str(s))}"
+            yield ""
+
+        feedback = data.get("feedback_text", "")
+        if feedback:
+            yield f"💬 {_esc(feedback)}"
+
+    return "\n".join(_gen())
 
 
 # ── Level change ────────────────────────────────────────
@@ -124,27 +123,18 @@ def format_level_change(old_level: int, new_level: int, label: str, cefr: str) -
 def format_user_stats(stats: dict, recent: list[dict]) -> str:
     lines = [
         "📊 <b>Моя статистика</b>",
-        "",
-        "━━━━━━━━━━━━━━━",
-        "📈 <b>Общие показатели</b>",
-        "━━━━━━━━━━━━━━━",
+        f"\n{_SEP}\n📈 <b>Общие показатели</b>\n{_SEP}",
         f"  Всего диалогов: <b>{stats['total_conversations']}</b>",
         f"  Завершено: <b>{stats['completed']}</b>",
         f"  Средний балл: <b>{_val(stats['avg_score'])}</b>",
         f"  Лучший балл: <b>{_val(stats['best_score'])}</b>",
-        "",
-        "━━━━━━━━━━━━━━━",
-        "📅 <b>За последние 7 дней</b>",
-        "━━━━━━━━━━━━━━━",
+        f"\n{_SEP}\n📅 <b>За последние 7 дней</b>\n{_SEP}",
         f"  Диалогов: <b>{stats['sessions_7d']}</b>",
         f"  Средний балл: <b>{_val(stats['avg_7d'])}</b>",
     ]
 
     if recent:
-        lines.append("")
-        lines.append("━━━━━━━━━━━━━━━")
-        lines.append("🕐 <b>Последние результаты</b>")
-        lines.append("━━━━━━━━━━━━━━━")
+        lines.append(_RECENT_SECTION)
         for r in recent:
             dt: datetime = r["created_at"]
             date_str = dt.strftime("%d.%m")
@@ -1,4 +1,5 @@
 import html
+import io
 from datetime import datetime, timezone
 
 CRITERIA = [
@@ -18,9 +19,20 @@ BAND_EMOJI = {
 }
 
 
+# Per-criterion HTML fragments are constant; build them once at import
+# instead of re-interpolating the labels on every assessment.
+_CRITERIA_SUMMARY = tuple((key, f"  {label}:  <b>") for key, label in CRITERIA)
+_CRITERIA_DETAIL = tuple((key, f"📌 <b>{label}</b>  —  <b>Band ") for key, label in CRITERIA)
+
+
+# Bands form a dense 0.0..9.0 half-step range, so index a tuple by
+# round(band * 2) instead of hashing a float key per lookup.
+_BAND_EMOJI_TUPLE = tuple(BAND_EMOJI[i / 2] for i in range(19))
+
+
 def _band_emoji(band: float) -> str:
-    rounded = round(band * 2) / 2
-    return BAND_EMOJI.get(rounded, "⚪")
+    i = round(band * 2)
+    return _BAND_EMOJI_TUPLE[i] if 0 <= i <= 18 else "⚪"
 
 
 def _esc(text: str) -> str:
@@ -32,45 +44,43 @@ def format_assessment(data: dict) -> str:
         return f"⚠️ {_esc(data['error'])}"
 
     overall = data.get("overall_band", 0)
-    lines = []
+    # One linear buffer instead of ~40 list appends plus a join pass.
+    buf = io.StringIO()
+    w = buf.write
 
-    lines.append("🎯 <b>IELTS Speaking Assessment</b>")
-    lines.append("")
-    lines.append("━━━━━━━━━━━━━━━")
-    lines.append(f"  {_band_emoji(overall)}  <b>Overall Band Score:  {overall}</b>")
-    lines.append("━━━━━━━━━━━━━━━")
-    lines.append("")
+    w("🎯 <b>IELTS Speaking Assessment</b>\n\n")
+    w("━━━━━━━━━━━━━━━\n")
+    w(f"  {_band_emoji(overall)}  <b>Overall Band Score:  {overall}</b>\n")
+    w("━━━━━━━━━━━━━━━\n\n")
 
-    for key, label in CRITERIA:
+    for key, label_part in _CRITERIA_SUMMARY:
         criterion = data.get(key, {})
         band = criterion.get("band", "–")
         band_f = float(band) if band != "–" else 0
-        lines.append(f"  {_band_emoji(band_f)}  {label}:  <b>{band}</b>")
+        w("  " + _band_emoji(band_f) + label_part + f"{band}</b>\n")
 
-    lines.append("")
-    lines.append("━━━━━━━━━━━━━━━")
-    lines.append("📋 <b>Подробный разбор</b>")
-    lines.append("━━━━━━━━━━━━━━━")
+    w("\n━━━━━━━━━━━━━━━\n")
+    w("📋 <b>Подробный разбор</b>\n")
+    w("━━━━━━━━━━━━━━━\n")
 
-    for key, label in CRITERIA:
+    for key, prefix in _CRITERIA_DETAIL:
         criterion = data.get(key, {})
         band = criterion.get("band", "–")
         explanation = criterion.get("explanation", "")
-        lines.append("")
-        lines.append(f"📌 <b>{label}</b>  —  <b>Band {band}</b>")
+        w("\n")
+        w(prefix + f"{band}</b>\n")
         if explanation:
-            lines.append(f"<i>{_esc(explanation)}</i>")
+            w(f"<i>{_esc(explanation)}</i>\n")
         examples = criterion.get("examples", [])
         if examples:
-            lines.append("")
+            w("\n")
             for ex in examples:
-                lines.append(f"  ▸ {_esc(ex)}")
+                w(f"  ▸ {_esc(ex)}\n")
 
-    lines.append("")
-    lines.append("─────────────────────")
-    lines.append("<i>Оценка по официальным IELTS Band Descriptors</i>")
+    w("\n─────────────────────\n")
+    w("<i>Оценка по официальным IELTS Band Descriptors</i>")
 
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
 def format_error(error_text: str) -> str:
@@ -124,13 +124,16 @@ PROCESSING_TEXT = (
 async def cmd_start(message: Message, state: FSMContext) -> None:
     await state.clear()
     user = message.from_user
-    await database.upsert_user(
-        user_id=user.id,
-        username=user.username,
-        first_name=user.first_name,
-        last_name=user.last_name,
+    # No ordering dependency — overlap the two round-trips
+    _, level_num = await asyncio.gather(
+        database.upsert_user(
+            user_id=user.id,
+            username=user.username,
+            first_name=user.first_name,
+            last_name=user.last_name,
+        ),
+        database.get_user_level(user.id),
     )
-    level_num = await database.get_user_level(user.id)
     level_info = format_level_info(level_num)
 
     await message.answer(
@@ -322,12 +325,13 @@ async def handle_start_conversation(callback: CallbackQuery, state: FSMContext)
     await callback.answer()
     await callback.message.edit_reply_markup(reply_markup=None)
 
-    # Create DB conversation
-    db_conv_id = await database.create_conversation(
+    # Create DB conversation + opening message in one round-trip
+    db_conv_id = await database.create_conversation_with_opening(
         user_id=callback.from_user.id,
         level=level_num,
         topic=topic,
         scenario=scenario,
+        opening_line=opening_line,
     )
     await state.update_data(db_conversation_id=db_conv_id)
 
@@ -345,15 +349,6 @@ async def handle_start_conversation(callback: CallbackQuery, state: FSMContext)
         exchange_count=0,
     )
 
-    # Save bot's opening message to DB
-    await database.save_message(
-        conversation_id=db_conv_id,
-        role="bot",
-        text=opening_line,
-        audio_file_id=None,
-        seq_num=0,
-    )
-
     # Send opening line as voice + text
     await bot.send_chat_action(callback.message.chat.id, ChatAction.TYPING)
 
@@ -425,7 +420,7 @@ async def handle_voice_in_conversation(message: Message, state: FSMContext) -> N
         await asyncio.gather(
             database.save_message(
                 conversation_id=db_conv_id,
-                role="user",
+                role=database.ROLE_USER,
                 text=user_text,
                 audio_file_id=message.voice.file_id,
                 seq_num=seq_num,
@@ -449,7 +444,7 @@ async def handle_voice_in_conversation(message: Message, state: FSMContext) -> N
     results = await asyncio.gather(
         database.save_message(
             conversation_id=db_conv_id,
-            role="user",
+            role=database.ROLE_USER,
             text=user_text,
             audio_file_id=message.voice.file_id,
             seq_num=seq_num,
@@ -490,7 +485,7 @@ async def handle_voice_in_conversation(message: Message, state: FSMContext) -> N
         text_to_voice(bot_reply),
         database.save_message(
             conversation_id=db_conv_id,
-            role="bot",
+            role=database.ROLE_BOT,
             text=bot_reply,
             audio_file_id=None,
             seq_num=len(history) - 1,
@@ -1,10 +1,14 @@
-import json
+import hashlib
 import logging
 import os
+import sys
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
 import asyncpg
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -12,19 +16,62 @@ _pool: asyncpg.Pool | None = None
 
 SCHEMA_PATH = Path(__file__).parent / "schema.sql"
 
+# Interned message-role constants — the same str object is reused on
+# every save_message call instead of a fresh literal per call site.
+ROLE_USER = sys.intern("user")
+ROLE_BOT = sys.intern("bot")
+
 
 # ── Pool lifecycle ──────────────────────────────────────
 
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    # Let the driver encode dicts straight to jsonb so callers skip the
+    # manual dumps + '::jsonb' cast; orjson is several times faster than
+    # stdlib json on these float-heavy payloads.
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=lambda v: orjson.dumps(v).decode(),
+        decoder=orjson.loads,
+        schema="pg_catalog", format="text",
+    )
+
+
 async def init_db() -> None:
     global _pool
     dsn = os.getenv("DATABASE_URL")
     if not dsn:
         logger.warning("DATABASE_URL not set — running without database")
         return
-    _pool = await asyncpg.create_pool(dsn=dsn, min_size=2, max_size=10, command_timeout=15)
+    _pool = await asyncpg.create_pool(
+        dsn=dsn,
+        min_size=int(os.getenv("DB_POOL_MIN", "5")),
+        max_size=int(os.getenv("DB_POOL_MAX", "20")),
+        command_timeout=15,
+        statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE", "1024")),
+        max_inactive_connection_lifetime=float(os.getenv("DB_MAX_INACTIVE_LIFETIME", "0")),
+        # JIT warmup costs more than these point queries ever save
+        server_settings={"jit": "off"},
+        init=_init_connection,
+    )
     schema_sql = SCHEMA_PATH.read_text(encoding="utf-8")
+    schema_hash = hashlib.sha256(schema_sql.encode()).hexdigest()
     async with _pool.acquire() as conn:
-        await conn.execute(schema_sql)
+        # Skip re-running the whole DDL file when it hasn't changed
+        # since the last start.
+        try:
+            current = await conn.fetchval("SELECT hash FROM schema_meta LIMIT 1")
+        except asyncpg.UndefinedTableError:
+            current = None
+        if current != schema_hash:
+            async with conn.transaction():
+                await conn.execute(schema_sql)
+                await conn.execute(
+                    "CREATE TABLE IF NOT EXISTS schema_meta (hash text PRIMARY KEY)"
+                )
+                await conn.execute("DELETE FROM schema_meta")
+                await conn.execute(
+                    "INSERT INTO schema_meta (hash) VALUES ($1)", schema_hash,
+                )
     logger.info("Database initialized")
 
 
@@ -47,8 +94,8 @@ async def _execute(query: str, *args: Any) -> str:
     try:
         async with _pool.acquire() as conn:
             return await conn.execute(query, *args)
-    except Exception:
-        logger.exception("DB execute error")
+    except Exception as exc:
+        logger.warning("DB execute error: %r", exc)
         return ""
 
 
@@ -58,8 +105,8 @@ async def _fetchrow(query: str, *args: Any) -> asyncpg.Record | None:
     try:
         async with _pool.acquire() as conn:
             return await conn.fetchrow(query, *args)
-    except Exception:
-        logger.exception("DB fetchrow error")
+    except Exception as exc:
+        logger.warning("DB fetchrow error: %r", exc)
         return None
 
 
@@ -69,8 +116,8 @@ async def _fetch(query: str, *args: Any) -> list[asyncpg.Record]:
     try:
         async with _pool.acquire() as conn:
             return await conn.fetch(query, *args)
-    except Exception:
-        logger.exception("DB fetch error")
+    except Exception as exc:
+        logger.warning("DB fetch error: %r", exc)
         return []
 
 
@@ -80,13 +127,20 @@ async def _fetchval(query: str, *args: Any) -> Any:
     try:
         async with _pool.acquire() as conn:
             return await conn.fetchval(query, *args)
-    except Exception:
-        logger.exception("DB fetchval error")
+    except Exception as exc:
+        logger.warning("DB fetchval error: %r", exc)
         return None
 
 
 # ── User operations ─────────────────────────────────────
 
+# Throttle last_active touches: one UPDATE per user per interval is
+# plenty, and skipping the unconditional upsert UPDATE avoids dead-tuple
+# churn for every incoming message.
+_LAST_ACTIVE_INTERVAL = 60.0
+_last_active_touch: dict[int, float] = {}
+
+
 async def upsert_user(
     user_id: int, username: str | None, first_name: str, last_name: str | None,
 ) -> None:
@@ -99,16 +153,40 @@ async def upsert_user(
             first_name = EXCLUDED.first_name,
             last_name  = EXCLUDED.last_name,
             last_active = now()
+        WHERE users.username   IS DISTINCT FROM EXCLUDED.username
+           OR users.first_name IS DISTINCT FROM EXCLUDED.first_name
+           OR users.last_name  IS DISTINCT FROM EXCLUDED.last_name
         """,
         user_id, username, first_name, last_name,
     )
+    now = time.monotonic()
+    last = _last_active_touch.get(user_id)
+    if last is None or now - last >= _LAST_ACTIVE_INTERVAL:
+        _last_active_touch[user_id] = now
+        await _execute(
+            "UPDATE users SET last_active = now() WHERE id = $1", user_id,
+        )
+
+
+# Levels only change through set_user_level, so cache them in memory
+# (LRU-bounded) instead of hitting Postgres on every message.
+_LEVEL_CACHE_MAX = 10_000
+_level_cache: OrderedDict[int, int] = OrderedDict()
 
 
 async def get_user_level(user_id: int) -> int:
+    cached = _level_cache.get(user_id)
+    if cached is not None:
+        _level_cache.move_to_end(user_id)
+        return cached
     val = await _fetchval(
         "SELECT difficulty_level FROM users WHERE id = $1", user_id,
     )
-    return val if val is not None else 3
+    level = val if val is not None else 3
+    _level_cache[user_id] = level
+    if len(_level_cache) > _LEVEL_CACHE_MAX:
+        _level_cache.popitem(last=False)
+    return level
 
 
 async def set_user_level(user_id: int, level: int) -> None:
@@ -116,6 +194,8 @@ async def set_user_level(user_id: int, level: int) -> None:
         "UPDATE users SET difficulty_level = $1 WHERE id = $2",
         level, user_id,
     )
+    _level_cache[user_id] = level
+    _level_cache.move_to_end(user_id)
 
 
 # ── Conversation operations ─────────────────────────────
@@ -135,8 +215,35 @@ async def create_conversation(
                 """,
                 user_id, level, topic, scenario,
             )
-    except Exception:
-        logger.exception("DB create_conversation error")
+    except Exception as exc:
+        logger.warning("DB create_conversation error: %r", exc)
+        return None
+
+
+async def create_conversation_with_opening(
+    user_id: int, level: int, topic: str, scenario: str | None,
+    opening_line: str,
+) -> int | None:
+    """Insert the conversation and its opening bot message in one round-trip."""
+    if not _pool:
+        return None
+    try:
+        async with _pool.acquire() as conn:
+            return await conn.fetchval(
+                """
+                WITH c AS (
+                    INSERT INTO conversations (user_id, difficulty_level, scenario_topic, scenario_text)
+                    VALUES ($1, $2, $3, $4)
+                    RETURNING id
+                )
+                INSERT INTO messages (conversation_id, role, text_content, audio_file_id, sequence_num)
+                SELECT id, 'bot', $5, NULL, 0 FROM c
+                RETURNING conversation_id
+                """,
+                user_id, level, topic, scenario, opening_line,
+            )
+    except Exception as exc:
+        logger.warning("DB create_conversation_with_opening error: %r", exc)
         return None
 
 
@@ -184,20 +291,26 @@ async def save_assessment(
 ) -> None:
     if conversation_id is None:
         return
+    # Ship the raw JSON once and let Postgres pull the columns out of it,
+    # instead of unpacking fields in Python and sending ten parameters.
     await _execute(
         """
         INSERT INTO assessments
             (conversation_id, user_id, overall_score,
              vocab_use, grammar, fluency, comprehension, pronunciation,
              feedback_text, raw_result)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10::jsonb)
+        SELECT $1, $2,
+               coalesce((r->>'overall_score')::float, 0),
+               coalesce((r->>'vocab_use')::float, 0),
+               coalesce((r->>'grammar')::float, 0),
+               coalesce((r->>'fluency')::float, 0),
+               coalesce((r->>'comprehension')::float, 0),
+               coalesce((r->>'pronunciation')::float, 0),
+               coalesce(r->>'feedback_text', ''),
+               r
+        FROM (SELECT $3::jsonb AS r) s
         """,
-        conversation_id,
-        user_id,
-        float(result.get("overall_score", 0)),
-        0.0, 0.0, 0.0, 0.0, 0.0,
-        result.get("feedback_text", ""),
-        json.dumps(result),
+        conversation_id, user_id, result,
     )
 
 
@@ -224,36 +337,45 @@ async def save_vocabulary(
                     for w in words
                 ],
             )
-    except Exception:
-        logger.exception("DB save_vocabulary error")
+    except Exception as exc:
+        logger.warning("DB save_vocabulary error: %r", exc)
 
 
 # ── Stats ───────────────────────────────────────────────
 
-async def get_user_stats(user_id: int) -> dict | None:
+async def get_user_stats(user_id: int) -> asyncpg.Record | None:
+    # Lifetime aggregates come from the trigger-maintained user_stats
+    # row; only the rolling 7-day window still touches assessments,
+    # bounded by the (user_id, created_at) index.
     row = await _fetchrow(
         """
         SELECT
-            count(*)                                             AS total_conversations,
-            count(*) FILTER (WHERE c.status = 'completed')       AS completed,
-            round(avg(a.overall_score)::numeric, 1)              AS avg_score,
-            max(a.overall_score)                                 AS best_score,
-            round(avg(a.overall_score) FILTER
-                (WHERE a.created_at > now() - interval '7 days')::numeric, 1) AS avg_7d,
-            count(*) FILTER
-                (WHERE a.created_at > now() - interval '7 days') AS sessions_7d
-        FROM conversations c
-        LEFT JOIN assessments a ON a.conversation_id = c.id
-        WHERE c.user_id = $1
+            s.total_conversations,
+            s.completed,
+            round((s.score_sum / nullif(s.score_count, 0))::numeric, 1) AS avg_score,
+            s.best_score,
+            w.avg_7d,
+            w.sessions_7d
+        FROM user_stats s
+        LEFT JOIN LATERAL (
+            SELECT
+                round(avg(a.overall_score)::numeric, 1) AS avg_7d,
+                count(*)                                AS sessions_7d
+            FROM assessments a
+            WHERE a.user_id = s.user_id
+              AND a.created_at > now() - interval '7 days'
+        ) w ON true
+        WHERE s.user_id = $1
         """,
         user_id,
     )
     if not row or row["total_conversations"] == 0:
         return None
-    return dict(row)
+    # Records support item access; no need to copy into a dict.
+    return row
 
 
-async def get_user_recent_assessments(user_id: int, limit: int = 5) -> list[dict]:
+async def get_user_recent_assessments(user_id: int, limit: int = 5) -> list[asyncpg.Record]:
     rows = await _fetch(
         """
         SELECT c.scenario_topic, c.difficulty_level, a.overall_score, a.created_at
@@ -265,7 +387,7 @@ async def get_user_recent_assessments(user_id: int, limit: int = 5) -> list[dict
         """,
         user_id, limit,
     )
-    return [dict(r) for r in rows]
+    return rows
 
 
 # ── Topic history ────────────────────────────────────────
@@ -3,7 +3,7 @@
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DifficultyLevel:
     level: int
     label: str
@@ -14,76 +14,67 @@ class DifficultyLevel:
     exchanges: int            # number of bot-user exchanges
 
 
-LEVELS: dict[int, DifficultyLevel] = {
+# (label, cefr, vocab_count, construction_count, max_sentence_words, exchanges)
+_ROWS: tuple[tuple[str, str, int, int, int, int], ...] = (
     # ── Absolute Beginner (A0–A1) ──────────────────────
-    1: DifficultyLevel(level=1, label="Principiante 1", cefr="A0",
-        vocab_count=5, construction_count=2, max_sentence_words=4, exchanges=4),
-    2: DifficultyLevel(level=2, label="Principiante 2", cefr="A0",
-        vocab_count=5, construction_count=2, max_sentence_words=5, exchanges=4),
-    3: DifficultyLevel(level=3, label="Principiante 3", cefr="A1",
-        vocab_count=5, construction_count=2, max_sentence_words=6, exchanges=4),
-    4: DifficultyLevel(level=4, label="Principiante 4", cefr="A1",
-        vocab_count=6, construction_count=2, max_sentence_words=7, exchanges=4),
-    5: DifficultyLevel(level=5, label="Principiante 5", cefr="A1",
-        vocab_count=6, construction_count=3, max_sentence_words=7, exchanges=4),
+    ("Principiante 1", "A0", 5, 2, 4, 4),
+    ("Principiante 2", "A0", 5, 2, 5, 4),
+    ("Principiante 3", "A1", 5, 2, 6, 4),
+    ("Principiante 4", "A1", 6, 2, 7, 4),
+    ("Principiante 5", "A1", 6, 3, 7, 4),
 
     # ── Elementary (A2) ────────────────────────────────
-    6: DifficultyLevel(level=6, label="Elemental 1", cefr="A2",
-        vocab_count=6, construction_count=3, max_sentence_words=9, exchanges=4),
-    7: DifficultyLevel(level=7, label="Elemental 2", cefr="A2",
-        vocab_count=6, construction_count=3, max_sentence_words=10, exchanges=4),
-    8: DifficultyLevel(level=8, label="Elemental 3", cefr="A2",
-        vocab_count=7, construction_count=3, max_sentence_words=10, exchanges=5),
-    9: DifficultyLevel(level=9, label="Elemental 4", cefr="A2",
-        vocab_count=7, construction_count=3, max_sentence_words=11, exchanges=5),
-    10: DifficultyLevel(level=10, label="Elemental 5", cefr="A2",
-        vocab_count=7, construction_count=3, max_sentence_words=12, exchanges=5),
+    ("Elemental 1", "A2", 6, 3, 9, 4),
+    ("Elemental 2", "A2", 6, 3, 10, 4),
+    ("Elemental 3", "A2", 7, 3, 10, 5),
+    ("Elemental 4", "A2", 7, 3, 11, 5),
+    ("Elemental 5", "A2", 7, 3, 12, 5),
 
     # ── Pre-Intermediate (B1) ──────────────────────────
-    11: DifficultyLevel(level=11, label="Intermedio 1", cefr="B1",
-        vocab_count=7, construction_count=3, max_sentence_words=14, exchanges=6),
-    12: DifficultyLevel(level=12, label="Intermedio 2", cefr="B1",
-        vocab_count=7, construction_count=3, max_sentence_words=14, exchanges=7),
-    13: DifficultyLevel(level=13, label="Intermedio 3", cefr="B1",
-        vocab_count=8, construction_count=3, max_sentence_words=15, exchanges=7),
-    14: DifficultyLevel(level=14, label="Intermedio 4", cefr="B1",
-        vocab_count=8, construction_count=4, max_sentence_words=15, exchanges=7),
-    15: DifficultyLevel(level=15, label="Intermedio 5", cefr="B1",
-        vocab_count=8, construction_count=4, max_sentence_words=16, exchanges=8),
+    ("Intermedio 1", "B1", 7, 3, 14, 6),
+    ("Intermedio 2", "B1", 7, 3, 14, 7),
+    ("Intermedio 3", "B1", 8, 3, 15, 7),
+    ("Intermedio 4", "B1", 8, 4, 15, 7),
+    ("Intermedio 5", "B1", 8, 4, 16, 8),
 
     # ── Intermediate (B2) ─────────────────────────────
-    16: DifficultyLevel(level=16, label="Avanzado 1", cefr="B2",
-        vocab_count=8, construction_count=4, max_sentence_words=18, exchanges=8),
-    17: DifficultyLevel(level=17, label="Avanzado 2", cefr="B2",
-        vocab_count=8, construction_count=4, max_sentence_words=18, exchanges=9),
-    18: DifficultyLevel(level=18, label="Avanzado 3", cefr="B2",
-        vocab_count=8, construction_count=4, max_sentence_words=20, exchanges=9),
-    19: DifficultyLevel(level=19, label="Avanzado 4", cefr="B2",
-        vocab_count=8, construction_count=4, max_sentence_words=20, exchanges=10),
-    20: DifficultyLevel(level=20, label="Avanzado 5", cefr="B2",
-        vocab_count=8, construction_count=4, max_sentence_words=22, exchanges=10),
+    ("Avanzado 1", "B2", 8, 4, 18, 8),
+    ("Avanzado 2", "B2", 8, 4, 18, 9),
+    ("Avanzado 3", "B2", 8, 4, 20, 9),
+    ("Avanzado 4", "B2", 8, 4, 20, 10),
+    ("Avanzado 5", "B2", 8, 4, 22, 10),
 
     # ── Advanced (C1–C2) ──────────────────────────────
-    21: DifficultyLevel(level=21, label="Superior 1", cefr="C1",
-        vocab_count=8, construction_count=4, max_sentence_words=25, exchanges=10),
-    22: DifficultyLevel(level=22, label="Superior 2", cefr="C1",
-        vocab_count=8, construction_count=4, max_sentence_words=25, exchanges=11),
-    23: DifficultyLevel(level=23, label="Superior 3", cefr="C1",
-        vocab_count=8, construction_count=4, max_sentence_words=28, exchanges=11),
-    24: DifficultyLevel(level=24, label="Superior 4", cefr="C2",
-        vocab_count=8, construction_count=4, max_sentence_words=30, exchanges=12),
-    25: DifficultyLevel(level=25, label="Superior 5", cefr="C2",
-        vocab_count=8, construction_count=4, max_sentence_words=30, exchanges=12),
+    ("Superior 1", "C1", 8, 4, 25, 10),
+    ("Superior 2", "C1", 8, 4, 25, 11),
+    ("Superior 3", "C1", 8, 4, 28, 11),
+    ("Superior 4", "C2", 8, 4, 30, 12),
+    ("Superior 5", "C2", 8, 4, 30, 12),
+)
+
+LEVELS: dict[int, DifficultyLevel] = {
+    i + 1: DifficultyLevel(i + 1, *row) for i, row in enumerate(_ROWS)
 }
 
 
+# Dense 1..25 range — a tuple index is cheaper than a dict lookup
+# on the per-message hot path. LEVELS stays public for callers that
+# want the mapping.
+_LEVELS: tuple[DifficultyLevel, ...] = tuple(LEVELS[i] for i in range(1, 26))
+
+
 def get_level(n: int) -> DifficultyLevel:
-    return LEVELS[max(1, min(25, n))]
+    return _LEVELS[max(0, min(24, n - 1))]
+
+
+# Only 25 levels and all static — format once at import instead of on
+# every render.
+_LEVEL_INFO: tuple[str, ...] = tuple(
+    f"Nivel {lvl.level} — {lvl.label} ({lvl.cefr})\n"
+    f"Intercambios: {lvl.exchanges}"
+    for lvl in _LEVELS
+)
 
 
 def format_level_info(n: int) -> str:
-    lvl = get_level(n)
-    return (
-        f"Nivel {lvl.level} — {lvl.label} ({lvl.cefr})\n"
-        f"Intercambios: {lvl.exchanges}"
-    )
+    return _LEVEL_INFO[max(0, min(24, n - 1))]
@@ -1,15 +1,32 @@
-import html
+import functools
 from datetime import datetime
 
+# Same output as html.escape(quote=True), but one C-level translate pass
+# instead of five str.replace passes.
+_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;",
+})
 
+
+# Topics, criteria labels and vocabulary entries repeat across renders,
+# so memoize; escaping is pure and inputs are short strings.
+@functools.lru_cache(maxsize=4096)
 def _esc(text: str) -> str:
-    return html.escape(text)
+    return text.translate(_ESCAPE_TABLE)
 
 
 def _val(v, default="—") -> str:
     return str(v) if v is not None else default
 
 
+# Ruled section headers, precomposed as single list elements: one append
+# instead of the blank-line/rule/title/rule quartet at every call site.
+_SEP = "━━━━━━━━━━━━━━━"
+_VOCAB_SECTION = f"\n{_SEP}\n📚 <b>Слова</b>\n{_SEP}"
+_CONSTR_SECTION = f"\n{_SEP}\n🧩 <b>Конструкции</b>\n{_SEP}"
+_RECENT_SECTION = f"\n\n{_SEP}\n🕐 <b>Последние результаты</b>\n{_SEP}"
+
+
 # ── Scenario display ────────────────────────────────────
 
 def format_scenario(
@@ -20,10 +37,7 @@ def format_scenario(
         f"🗣 <b>{_esc(topic)}</b>",
         "",
         f"<i>{_esc(scenario)}</i>",
-        "",
-        "━━━━━━━━━━━━━━━",
-        "📚 <b>Слова</b>",
-        "━━━━━━━━━━━━━━━",
+        _VOCAB_SECTION,
     ]
 
     for w in vocabulary:
@@ -35,10 +49,7 @@ def format_scenario(
             lines.append(f"    <i>{example}</i>")
 
     if constructions:
-        lines.append("")
-        lines.append("━━━━━━━━━━━━━━━")
-        lines.append("🧩 <b>Конструкции</b>")
-        lines.append("━━━━━━━━━━━━━━━")
+        lines.append(_CONSTR_SECTION)
         for c in constructions:
             spanish = _esc(c.get("spanish", ""))
             russian = _esc(c.get("russian", ""))
@@ -58,46 +69,43 @@ def format_assessment(data: dict) -> str:
     if "error" in data:
         return f"⚠️ {_esc(data['error'])}"
 
-    lines = []
-
-    # Praise
-    praise = data.get("praise", "")
-    if praise:
-        lines.append(f"👏 {_esc(praise)}")
-        lines.append("")
-
-    # Mistakes
-    mistakes = data.get("mistakes", [])
-    if mistakes:
-        lines.append("✏️ <b>Обрати внимание:</b>")
-        for m in mistakes:
-            said = _esc(m.get("said", ""))
-            correction = _esc(m.get("correction", ""))
-            note = _esc(m.get("note", ""))
-            lines.append(f"  • <s>{said}</s> → <b>{correction}</b>")
-            if note:
-                lines.append(f"    <i>{note}</i>")
-        lines.append("")
-
-    # Suggestions
-    suggestions = data.get("suggestions", [])
-    if suggestions:
-        lines.append("💡 <b>Слова на заметку:</b>")
-        for s in suggestions:
-            if isinstance(s, dict):
-                word = _esc(s.get("word", ""))
-                translation = _esc(s.get("translation", ""))
-                lines.append(f"  • <b>{word}</b> — {translation}")
-            else:
-                lines.append(f"  • {_esc(str(s))}")
-        lines.append("")
-
-    # Feedback
-    feedback = data.get("feedback_text", "")
-    if feedback:
-        lines.append(f"💬 {_esc(feedback)}")
-
-    return "\n".join(lines)
+    # Yield lines instead of growing a list — join drains the generator
+    # in one pass with no intermediate reallocations.
+    def _gen():
+        praise = data.get("praise", "")
+        if praise:
+            yield f"👏 {_esc(praise)}"
+            yield ""
+
+        mistakes = data.get("mistakes", [])
+        if mistakes:
+            yield "✏️ <b>Обрати внимание:</b>"
+            for m in mistakes:
+                said = _esc(m.get("said", ""))
+                correction = _esc(m.get("correction", ""))
+                note = _esc(m.get("note", ""))
+                yield f"  • <s>{said}</s> → <b>{correction}</b>"
+                if note:
+                    yield f"    <i>{note}</i>"
+            yield ""
+
+        suggestions = data.get("suggestions", [])
+        if suggestions:
+            yield "💡 <b>Слова на заметку:</b>"
+            for s in suggestions:
+                if isinstance(s, dict):
+                    word = _esc(s.get("word", ""))
+                    translation = _esc(s.get("translation", ""))
+                    yield f"  • <b>{word}</b> — {translation}"
+                else:
+                    yield f"  • {_esc(str(s))}"
+            yield ""
+
+        feedback = data.get("feedback_text", "")
+        if feedback:
+            yield f"💬 {_esc(feedback)}"
+
+    return "\n".join(_gen())
 
 
 # ── Level change ────────────────────────────────────────
@@ -118,39 +126,50 @@ def format_level_change(old_level: int, new_level: int, label: str, cefr: str) -
 
 # ── User stats ──────────────────────────────────────────
 
+# The fixed skeleton of the stats message, filled in one format() call
+# instead of sixteen list appends plus a join.
+_STATS_HEADER_TMPL = (
+    "📊 <b>Моя статистика</b>\n"
+    "\n"
+    "━━━━━━━━━━━━━━━\n"
+    "📈 <b>Общие показатели</b>\n"
+    "━━━━━━━━━━━━━━━\n"
+    "  Всего диалогов: <b>{total_conversations}</b>\n"
+    "  Завершено: <b>{completed}</b>\n"
+    "  Средний балл: <b>{avg_score}</b>\n"
+    "  Лучший балл: <b>{best_score}</b>\n"
+    "\n"
+    "━━━━━━━━━━━━━━━\n"
+    "📅 <b>За последние 7 дней</b>\n"
+    "━━━━━━━━━━━━━━━\n"
+    "  Диалогов: <b>{sessions_7d}</b>\n"
+    "  Средний балл: <b>{avg_7d}</b>"
+)
+
+
 def format_user_stats(stats: dict, recent: list[dict]) -> str:
-    lines = [
-        "📊 <b>Моя статистика</b>",
-        "",
-        "━━━━━━━━━━━━━━━",
-        "📈 <b>Общие показатели</b>",
-        "━━━━━━━━━━━━━━━",
-        f"  Всего диалогов: <b>{stats['total_conversations']}</b>",
-        f"  Завершено: <b>{stats['completed']}</b>",
-        f"  Средний балл: <b>{_val(stats['avg_score'])}</b>",
-        f"  Лучший балл: <b>{_val(stats['best_score'])}</b>",
-        "",
-        "━━━━━━━━━━━━━━━",
-        "📅 <b>За последние 7 дней</b>",
-        "━━━━━━━━━━━━━━━",
-        f"  Диалогов: <b>{stats['sessions_7d']}</b>",
-        f"  Средний балл: <b>{_val(stats['avg_7d'])}</b>",
-    ]
+    text = _STATS_HEADER_TMPL.format(
+        total_conversations=stats["total_conversations"],
+        completed=stats["completed"],
+        avg_score=_val(stats["avg_score"]),
+        best_score=_val(stats["best_score"]),
+        sessions_7d=stats["sessions_7d"],
+        avg_7d=_val(stats["avg_7d"]),
+    )
 
     if recent:
-        lines.append("")
-        lines.append("━━━━━━━━━━━━━━━")
-        lines.append("🕐 <b>Последние результаты</b>")
-        lines.append("━━━━━━━━━━━━━━━")
+        rows = []
         for r in recent:
             dt: datetime = r["created_at"]
-            date_str = dt.strftime("%d.%m")
+            # fixed "%d.%m" format — direct int formatting skips strftime
+            date_str = f"{dt.day:02d}.{dt.month:02d}"
             topic = _esc(r["scenario_topic"])
             score = r["overall_score"]
             lvl = r["difficulty_level"]
-            lines.append(f"  Lvl {lvl} «{topic}» — <b>{score}</b>  ({date_str})")
+            rows.append(f"  Lvl {lvl} «{topic}» — <b>{score}</b>  ({date_str})")
+        text += _RECENT_SECTION + "\n" + "\n".join(rows)
 
-    return "\n".join(lines)
+    return text
 
 
 def format_error(error_text: str) -> str:
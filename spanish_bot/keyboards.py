@@ -5,7 +5,12 @@ from aiogram.types import (
     ReplyKeyboardMarkup,
 )
 
-from states import TopicAction, ResultAction
+from states import (
+    RESULT_MENU_CB,
+    RESULT_NEW_CB,
+    TOPIC_ANOTHER_CB,
+    TOPIC_START_CB,
+)
 
 # Reply keyboard button labels
 NEW_DIALOG_BTN = "\U0001f5e3 Nuevo dialogo"
@@ -13,49 +18,59 @@ LEVEL_UP_BTN = "\U0001f4c8 Subir dificultad"
 LEVEL_DOWN_BTN = "\U0001f4c9 Bajar dificultad"
 END_BTN = "\u26d4 Terminar"
 
+# All four keyboards are fully static, so build each markup once at
+# import and hand out the same instance — aiogram never mutates them.
+_MAIN_MENU = ReplyKeyboardMarkup(
+    keyboard=[
+        [KeyboardButton(text=NEW_DIALOG_BTN)],
+        [KeyboardButton(text=LEVEL_UP_BTN), KeyboardButton(text=LEVEL_DOWN_BTN)],
+    ],
+    resize_keyboard=True,
+)
+
+_CONVERSATION = ReplyKeyboardMarkup(
+    keyboard=[[KeyboardButton(text=END_BTN)]],
+    resize_keyboard=True,
+)
+
+_TOPIC = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(
+            text="Empezar",
+            callback_data=TOPIC_START_CB,
+        ),
+        InlineKeyboardButton(
+            text="Otro tema",
+            callback_data=TOPIC_ANOTHER_CB,
+        ),
+    ],
+])
+
+_RESULTS = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(
+            text="Nuevo dialogo",
+            callback_data=RESULT_NEW_CB,
+        ),
+        InlineKeyboardButton(
+            text="Menu",
+            callback_data=RESULT_MENU_CB,
+        ),
+    ],
+])
+
 
 def main_menu_keyboard() -> ReplyKeyboardMarkup:
-    return ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text=NEW_DIALOG_BTN)],
-            [KeyboardButton(text=LEVEL_UP_BTN), KeyboardButton(text=LEVEL_DOWN_BTN)],
-        ],
-        resize_keyboard=True,
-    )
+    return _MAIN_MENU
 
 
 def conversation_keyboard() -> ReplyKeyboardMarkup:
-    return ReplyKeyboardMarkup(
-        keyboard=[[KeyboardButton(text=END_BTN)]],
-        resize_keyboard=True,
-    )
+    return _CONVERSATION
 
 
 def topic_keyboard() -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(
-                text="Empezar",
-                callback_data=TopicAction(action="start").pack(),
-            ),
-            InlineKeyboardButton(
-                text="Otro tema",
-                callback_data=TopicAction(action="another").pack(),
-            ),
-        ],
-    ])
+    return _TOPIC
 
 
 def results_keyboard() -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(
-                text="Nuevo dialogo",
-                callback_data=ResultAction(action="new").pack(),
-            ),
-            InlineKeyboardButton(
-                text="Menu",
-                callback_data=ResultAction(action="menu").pack(),
-            ),
-        ],
-    ])
+    return _RESULTS
@@ -56,6 +56,93 @@ CREATE TABLE IF NOT EXISTS assessments (
     created_at      TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+-- Running per-user aggregates maintained by triggers, so /stats is a
+-- single-row lookup instead of a scan over the whole history.
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id             BIGINT PRIMARY KEY REFERENCES users(id),
+    total_conversations INTEGER NOT NULL DEFAULT 0,
+    completed           INTEGER NOT NULL DEFAULT 0,
+    score_sum           REAL NOT NULL DEFAULT 0,
+    score_count         INTEGER NOT NULL DEFAULT 0,
+    best_score          REAL,
+    last_update         TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS assessments_user_created_idx
+    ON assessments (user_id, created_at DESC);
+
+CREATE OR REPLACE FUNCTION user_stats_conversation_ins() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO user_stats (user_id, total_conversations)
+    VALUES (NEW.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_conversations = user_stats.total_conversations + 1,
+        last_update = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION user_stats_conversation_upd() RETURNS trigger AS $$
+BEGIN
+    IF NEW.status = 'completed' AND OLD.status IS DISTINCT FROM 'completed' THEN
+        UPDATE user_stats SET
+            completed = completed + 1,
+            last_update = now()
+        WHERE user_id = NEW.user_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION user_stats_assessment_ins() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO user_stats (user_id, score_sum, score_count, best_score)
+    VALUES (NEW.user_id, NEW.overall_score, 1, NEW.overall_score)
+    ON CONFLICT (user_id) DO UPDATE SET
+        score_sum   = user_stats.score_sum + NEW.overall_score,
+        score_count = user_stats.score_count + 1,
+        best_score  = greatest(coalesce(user_stats.best_score, 0), NEW.overall_score),
+        last_update = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER user_stats_on_conversation_ins
+    AFTER INSERT ON conversations
+    FOR EACH ROW EXECUTE FUNCTION user_stats_conversation_ins();
+
+CREATE OR REPLACE TRIGGER user_stats_on_conversation_upd
+    AFTER UPDATE ON conversations
+    FOR EACH ROW EXECUTE FUNCTION user_stats_conversation_upd();
+
+CREATE OR REPLACE TRIGGER user_stats_on_assessment_ins
+    AFTER INSERT ON assessments
+    FOR EACH ROW EXECUTE FUNCTION user_stats_assessment_ins();
+
+-- Backfill for users whose history predates user_stats: the triggers
+-- only count activity from the moment they were installed. Seed missing
+-- rows from the existing data; ON CONFLICT DO NOTHING keeps re-running
+-- this schema idempotent and never overwrites trigger-maintained rows.
+INSERT INTO user_stats (user_id, total_conversations, completed,
+                        score_sum, score_count, best_score)
+SELECT c.user_id,
+       count(*),
+       count(*) FILTER (WHERE c.status = 'completed'),
+       coalesce(a.score_sum, 0),
+       coalesce(a.score_count, 0),
+       a.best_score
+FROM conversations c
+LEFT JOIN (
+    SELECT user_id,
+           sum(overall_score) AS score_sum,
+           count(*)           AS score_count,
+           max(overall_score) AS best_score
+    FROM assessments
+    GROUP BY user_id
+) a ON a.user_id = c.user_id
+GROUP BY c.user_id, a.score_sum, a.score_count, a.best_score
+ON CONFLICT (user_id) DO NOTHING;
+
 CREATE TABLE IF NOT EXISTS user_topic_history (
     user_id      BIGINT NOT NULL REFERENCES users(id),
     cefr_level   TEXT NOT NULL,
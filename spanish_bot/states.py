@@ -16,3 +16,11 @@ class TopicAction(CallbackData, prefix="topic"):
 
 class ResultAction(CallbackData, prefix="result"):
     action: str  # "new" or "menu"
+
+
+# Packed payloads for the fixed action set — built once so keyboard
+# builders skip a pydantic model instantiation per button.
+TOPIC_START_CB = TopicAction(action="start").pack()
+TOPIC_ANOTHER_CB = TopicAction(action="another").pack()
+RESULT_NEW_CB = ResultAction(action="new").pack()
+RESULT_MENU_CB = ResultAction(action="menu").pack()
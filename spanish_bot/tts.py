@@ -2,7 +2,9 @@ import asyncio
 import io
 import logging
 import os
+from collections import OrderedDict
 
+import httpx
 from openai import AsyncOpenAI
 
 logger = logging.getLogger(__name__)
@@ -13,25 +15,67 @@ _openai_client: AsyncOpenAI | None = None
 def _get_openai_client() -> AsyncOpenAI:
     global _openai_client
     if _openai_client is None:
-        _openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # TTS runs on every bot turn; a generous keepalive pool keeps
+        # TLS handshakes off the hot path.
+        _openai_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_keepalive_connections=32,
+                    max_connections=64,
+                    keepalive_expiry=120,
+                ),
+            ),
+        )
     return _openai_client
 
 
+# Identical text + model + voice yields identical audio, and greetings /
+# vocabulary examples repeat a lot. ~256 blobs at 20-50KB each caps the
+# cache around 10MB. Per-key locks stop concurrent first requests from
+# all paying for the same generation.
+_TTS_CACHE_MAX = 256
+_tts_cache: OrderedDict[tuple[str, str, str], bytes] = OrderedDict()
+_tts_locks: dict[tuple[str, str, str], asyncio.Lock] = {}
+
+
 async def text_to_voice(text: str, user_id: int | None = None) -> bytes:
     """Convert text to OGG OPUS audio bytes for Telegram voice messages."""
     provider = os.getenv("AI_PROVIDER", "openai").lower()
     uid_tag = f"user_id={user_id} " if user_id else ""
-    logger.info("%sTTS via provider=%s text_len=%d", uid_tag, provider, len(text))
+    if provider == "google":
+        key = ("gtts", "es", text)
+    else:
+        key = (os.getenv("TTS_MODEL", "tts-1"), os.getenv("TTS_VOICE", "nova"), text)
+
+    cached = _tts_cache.get(key)
+    if cached is not None:
+        _tts_cache.move_to_end(key)
+        logger.info("%sTTS cache hit bytes=%d", uid_tag, len(cached))
+        return cached
+
+    lock = _tts_locks.setdefault(key, asyncio.Lock())
     try:
-        if provider == "google":
-            result = await _gtts_text_to_voice(text)
-        else:
-            result = await _openai_text_to_voice(text)
-        logger.info("%sTTS OK bytes=%d", uid_tag, len(result))
-        return result
-    except Exception as e:
-        logger.error("%sTTS failed [provider=%s]: %s", uid_tag, provider, e)
-        raise
+        async with lock:
+            cached = _tts_cache.get(key)
+            if cached is not None:
+                return cached
+            logger.info("%sTTS via provider=%s text_len=%d", uid_tag, provider, len(text))
+            try:
+                if provider == "google":
+                    result = await _gtts_text_to_voice(text)
+                else:
+                    result = await _openai_text_to_voice(text)
+            except Exception as e:
+                logger.error("%sTTS failed [provider=%s]: %s", uid_tag, provider, e)
+                raise
+            logger.info("%sTTS OK bytes=%d", uid_tag, len(result))
+            _tts_cache[key] = result
+            if len(_tts_cache) > _TTS_CACHE_MAX:
+                _tts_cache.popitem(last=False)
+            return result
+    finally:
+        _tts_locks.pop(key, None)
 
 
 async def _openai_text_to_voice(text: str) -> bytes:
@@ -1,7 +1,7 @@
 import asyncio
+import io
 import logging
 import os
-import tempfile
 from logging.handlers import RotatingFileHandler
 
 from dotenv import load_dotenv
@@ -80,17 +80,13 @@ async def handle_media(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     tg_file = await context.bot.get_file(file_id)
     ext = EXT_BY_MIME.get(mime, ".ogg")
 
-    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
-        temp_path = tmp.name
-
-    try:
-        await tg_file.download_to_drive(temp_path)
-        text = await transcribe(temp_path, mime, user_id=user_id)
-    finally:
-        try:
-            os.remove(temp_path)
-        except OSError:
-            pass
+    # Keep the audio in memory — no temp file, no disk round-trip.
+    # The OpenAI SDK only needs a file-like object with a .name.
+    buf = io.BytesIO()
+    await tg_file.download_to_memory(buf)
+    buf.seek(0)
+    buf.name = f"audio{ext}"
+    text = await transcribe(buf, mime, user_id=user_id)
 
     if text and text.strip():
         provider = os.getenv("AI_PROVIDER", "openai").lower()
@@ -1,30 +1,36 @@
 import asyncio
 import logging
 import os
+from typing import BinaryIO
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 logger = logging.getLogger(__name__)
 
-_openai_client: OpenAI | None = None
+_openai_client: AsyncOpenAI | None = None
 
+# Bound concurrent transcriptions so a burst of forwarded voice messages
+# multiplexes over the event loop without saturating the API.
+_sem = asyncio.Semaphore(int(os.getenv("TRANSCRIBE_CONCURRENCY", "8")))
 
-def _get_openai_client() -> OpenAI:
+
+def _get_openai_client() -> AsyncOpenAI:
     global _openai_client
     if _openai_client is None:
-        _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        _openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     return _openai_client
 
 
-async def transcribe(path: str, mime: str, user_id: int | None = None) -> str | None:
+async def transcribe(audio: str | BinaryIO, mime: str, user_id: int | None = None) -> str | None:
+    """Transcribe audio from a file path or an in-memory file-like object."""
     provider = os.getenv("AI_PROVIDER", "openai").lower()
     uid_tag = f"user_id={user_id} " if user_id else ""
     logger.info("%stranscribing via provider=%s mime=%s", uid_tag, provider, mime)
     try:
         if provider == "google":
-            result = await _transcribe_google(path, mime)
+            result = await _transcribe_google(audio, mime)
         else:
-            result = await _transcribe_openai(path)
+            result = await _transcribe_openai(audio)
         if result:
             logger.info("%stranscription OK text_len=%d provider=%s", uid_tag, len(result), provider)
         else:
@@ -35,15 +41,18 @@ async def transcribe(path: str, mime: str, user_id: int | None = None) -> str |
         return None
 
 
-async def _transcribe_openai(path: str) -> str | None:
-    def _do():
-        with open(path, "rb") as f:
-            r = _get_openai_client().audio.transcriptions.create(model="whisper-1", file=f)
-            return getattr(r, "text", None)
-    return await asyncio.to_thread(_do)
+async def _transcribe_openai(audio: str | BinaryIO) -> str | None:
+    async with _sem:
+        if isinstance(audio, str):
+            with open(audio, "rb") as f:
+                r = await _get_openai_client().audio.transcriptions.create(model="whisper-1", file=f)
+        else:
+            audio.seek(0)
+            r = await _get_openai_client().audio.transcriptions.create(model="whisper-1", file=audio)
+    return getattr(r, "text", None)
 
 
-async def _transcribe_google(path: str, mime: str) -> str | None:
+async def _transcribe_google(audio: str | BinaryIO, mime: str) -> str | None:
     from google import genai
     from google.genai import types
 
@@ -51,8 +60,12 @@ async def _transcribe_google(path: str, mime: str) -> str | None:
     model_name = os.getenv("GOOGLE_AUDIO_MODEL", "gemini-2.0-flash")
 
     def _do():
-        with open(path, "rb") as f:
-            audio_bytes = f.read()
+        if isinstance(audio, str):
+            with open(audio, "rb") as f:
+                audio_bytes = f.read()
+        else:
+            audio.seek(0)
+            audio_bytes = audio.read()
         response = client.models.generate_content(
             model=model_name,
             contents=[
@@ -62,4 +75,5 @@ async def _transcribe_google(path: str, mime: str) -> str | None:
         )
         return response.text.strip() or None
 
-    return await asyncio.to_thread(_do)
+    async with _sem:
+        return await asyncio.to_thread(_do)
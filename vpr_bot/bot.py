@@ -5,32 +5,89 @@ VPR Math Bot — main entry point.
 import asyncio
 import logging
 import os
+import time
 from logging.handlers import RotatingFileHandler
 
-from aiogram import Bot, Dispatcher
+from aiogram import BaseMiddleware, Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from config import BOT_TOKEN
-from database import init_db
+from database import handler_connection, init_db
+from generator import pool_refill_loop
 from handlers import common, stats, test, training
 
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter whose asctime strftime result is cached per second.
+
+    Records emitted within the same second reuse the formatted prefix;
+    only the millisecond suffix is recomputed.
+    """
+
+    _cached_sec: int = -1
+    _cached_str: str = ""
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        sec = int(record.created)
+        if sec != self._cached_sec:
+            self._cached_str = time.strftime(
+                datefmt or self.default_time_format, self.converter(record.created)
+            )
+            self._cached_sec = sec
+        if datefmt:
+            return self._cached_str
+        return self.default_msec_format % (self._cached_str, record.msecs)
+
+
+_formatter = _CachedTimeFormatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
 os.makedirs("logs", exist_ok=True)
 _log_handler = RotatingFileHandler("logs/vpr_bot.log", maxBytes=5_000_000, backupCount=3)
-_log_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
+_log_handler.setFormatter(_formatter)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_formatter)
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[_log_handler, logging.StreamHandler()],
+    handlers=[_log_handler, _stream_handler],
 )
 logger = logging.getLogger(__name__)
 
 
+class DbConnectionMiddleware(BaseMiddleware):
+    """Pin one pooled DB connection per handler run, acquired on first use."""
+
+    async def __call__(self, handler, event, data):
+        async with handler_connection():
+            return await handler(event, data)
+
+
+_refill_task: asyncio.Task | None = None
+
+
+def _log_refill_exit(task: asyncio.Task) -> None:
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        logger.error("pool refill loop crashed", exc_info=task.exception())
+
+
 async def main() -> None:
     await init_db()
     logger.info("Database initialised")
 
+    # Keep the pre-generated task pool topped up in the background
+    # (backed by the task_pool table, or in-memory when no database).
+    # The handle lives for the process: a bare create_task could be
+    # garbage-collected mid-loop, and a crash would go unobserved.
+    global _refill_task
+    _refill_task = asyncio.create_task(pool_refill_loop())
+    _refill_task.add_done_callback(_log_refill_exit)
+
     bot = Bot(token=BOT_TOKEN, parse_mode="HTML")
+    # MemoryStorage keeps FSM state as plain dicts — no serialization per
+    # update. If this ever moves to RedisStorage, pass orjson as the
+    # json_loads/json_dumps pair: test_answers payloads grow with every
+    # answered task.
     dp = Dispatcher(storage=MemoryStorage())
+    dp.update.middleware(DbConnectionMiddleware())
 
     # Register routers (order matters — more specific first)
     dp.include_router(common.router)
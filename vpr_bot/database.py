@@ -7,13 +7,17 @@ Tables:
   - tasks           (static task bank)
 """
 
-import json
 import logging
 import os
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from pathlib import Path
 from typing import Any, Optional
 
 import asyncpg
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -26,13 +30,31 @@ SCHEMA_PATH = Path(__file__).parent / "schema.sql"
 # Pool lifecycle
 # ---------------------------------------------------------------------------
 
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    # Let the driver encode tasks_json straight from Python lists/dicts
+    # instead of a manual dumps before every insert; orjson is several
+    # times faster than stdlib json and always emits UTF-8.
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=lambda v: orjson.dumps(v).decode(),
+        decoder=orjson.loads,
+        schema="pg_catalog", format="text",
+    )
+
+
 async def init_db() -> None:
     global _pool
     dsn = os.getenv("DATABASE_URL")
     if not dsn:
         logger.warning("DATABASE_URL not set — running without database")
         return
-    _pool = await asyncpg.create_pool(dsn=dsn, min_size=2, max_size=10, command_timeout=15)
+    # Large statement cache with no expiry: the bot runs a small fixed
+    # set of queries, so every one stays server-side prepared.
+    _pool = await asyncpg.create_pool(
+        dsn=dsn, min_size=2, max_size=10, command_timeout=15,
+        statement_cache_size=1024, max_cached_statement_lifetime=0,
+        init=_init_connection,
+    )
     schema_sql = SCHEMA_PATH.read_text(encoding="utf-8")
     async with _pool.acquire() as conn:
         await conn.execute(schema_sql)
@@ -54,10 +76,75 @@ def is_available() -> bool:
 # Low-level helpers
 # ---------------------------------------------------------------------------
 
+# A handler run that issues several queries can pin one pooled
+# connection via handler_connection() instead of paying an
+# acquire/release cycle per query. The connection is acquired on first
+# actual DB use, not when the context opens: handlers spend most of
+# their time awaiting LLM calls, and holding a pooled connection across
+# those would exhaust a max_size=10 pool under modest load.
+
+class _ConnHolder:
+    __slots__ = ("conn",)
+
+    def __init__(self) -> None:
+        self.conn: asyncpg.Connection | None = None
+
+
+_conn_ctx: ContextVar[_ConnHolder | None] = ContextVar("vpr_db_conn", default=None)
+
+
+@asynccontextmanager
+async def handler_connection():
+    """Share one lazily-acquired pooled connection for queries in this context."""
+    if not _pool or _conn_ctx.get() is not None:
+        yield
+        return
+    holder = _ConnHolder()
+    token = _conn_ctx.set(holder)
+    try:
+        yield
+    finally:
+        _conn_ctx.reset(token)
+        if holder.conn is not None:
+            await _pool.release(holder.conn)
+
+
+def detach_connection() -> None:
+    """Stop the current task from sharing its spawner's pinned connection.
+
+    asyncio.create_task copies the context, so a background task started
+    inside handler_connection() would otherwise keep using a connection
+    that goes back to the pool the moment the handler returns — and then
+    collide with whoever acquires it next. Call this first in any task
+    that outlives its handler; its queries fall back to per-query acquire.
+    """
+    if _conn_ctx.get() is not None:
+        _conn_ctx.set(None)
+
+
+async def _ctx_conn() -> asyncpg.Connection | None:
+    """This context's pinned connection, acquired on first use."""
+    holder = _conn_ctx.get()
+    if holder is None:
+        return None
+    if holder.conn is None:
+        conn = await _pool.acquire()
+        if holder.conn is None:
+            holder.conn = conn
+        else:
+            # Lost a first-use race within the same context — keep the
+            # winner's connection.
+            await _pool.release(conn)
+    return holder.conn
+
+
 async def _execute(query: str, *args: Any) -> str:
     if not _pool:
         return ""
     try:
+        conn = await _ctx_conn()
+        if conn is not None:
+            return await conn.execute(query, *args)
         async with _pool.acquire() as conn:
             return await conn.execute(query, *args)
     except Exception:
@@ -69,6 +156,9 @@ async def _fetchrow(query: str, *args: Any) -> asyncpg.Record | None:
     if not _pool:
         return None
     try:
+        conn = await _ctx_conn()
+        if conn is not None:
+            return await conn.fetchrow(query, *args)
         async with _pool.acquire() as conn:
             return await conn.fetchrow(query, *args)
     except Exception:
@@ -80,6 +170,9 @@ async def _fetch(query: str, *args: Any) -> list[asyncpg.Record]:
     if not _pool:
         return []
     try:
+        conn = await _ctx_conn()
+        if conn is not None:
+            return await conn.fetch(query, *args)
         async with _pool.acquire() as conn:
             return await conn.fetch(query, *args)
     except Exception:
@@ -91,6 +184,9 @@ async def _fetchval(query: str, *args: Any) -> Any:
     if not _pool:
         return None
     try:
+        conn = await _ctx_conn()
+        if conn is not None:
+            return await conn.fetchval(query, *args)
         async with _pool.acquire() as conn:
             return await conn.fetchval(query, *args)
     except Exception:
@@ -119,6 +215,23 @@ async def upsert_user(user_id: int, username: Optional[str], first_name: Optiona
 # Task bank (static pre-made tasks)
 # ---------------------------------------------------------------------------
 
+# ORDER BY RANDOM() sorts every matching row per call. The task bank is
+# static, so cache the per-(grade, task_num) row count briefly and jump
+# to a random offset instead — O(offset) tuples read, no sort.
+_TASK_COUNT_TTL = 300.0
+_task_count_cache: dict[tuple[int, int], tuple[float, int]] = {}
+
+
+async def _cached_task_count(grade: int, task_num: int) -> int:
+    now = time.monotonic()
+    entry = _task_count_cache.get((grade, task_num))
+    if entry is not None and now - entry[0] < _TASK_COUNT_TTL:
+        return entry[1]
+    cnt = await count_tasks(grade, task_num)
+    _task_count_cache[(grade, task_num)] = (now, cnt)
+    return cnt
+
+
 async def get_random_task(grade: int, task_num: int, exclude_ids: list[int] | None = None) -> Optional[dict]:
     """
     Return a random task for the given grade/task_num.
@@ -126,35 +239,38 @@ async def get_random_task(grade: int, task_num: int, exclude_ids: list[int] | No
     If all tasks are excluded, ignore the exclusion list (reset).
     """
     excl = exclude_ids or []
+    total = await _cached_task_count(grade, task_num)
 
     # Try to get a task not yet seen
     if excl:
+        remaining = max(total - len(excl), 1)
         row = await _fetchrow(
             """
             SELECT id, grade, task_num, topic, task_text, correct_answer, solution,
                    has_image, image_url, image_file_id
             FROM tasks
             WHERE grade = $1 AND task_num = $2 AND id != ALL($3)
-            ORDER BY RANDOM()
+            OFFSET $4
             LIMIT 1
             """,
-            grade, task_num, excl,
+            grade, task_num, excl, random.randrange(remaining),
         )
     else:
         row = None
 
     # Fallback: get any task (reset seen list)
     if row is None:
+        offset = random.randrange(total) if total > 0 else 0
         row = await _fetchrow(
             """
             SELECT id, grade, task_num, topic, task_text, correct_answer, solution,
                    has_image, image_url, image_file_id
             FROM tasks
             WHERE grade = $1 AND task_num = $2
-            ORDER BY RANDOM()
+            OFFSET $3
             LIMIT 1
             """,
-            grade, task_num,
+            grade, task_num, offset,
         )
 
     return dict(row) if row else None
@@ -177,6 +293,90 @@ async def update_task_image_file_id(task_id: int, file_id: str) -> None:
     )
 
 
+# ---------------------------------------------------------------------------
+# Pre-generated task pool (see generator.py)
+# ---------------------------------------------------------------------------
+
+async def pop_pooled_task(grade: int, task_num: int) -> Optional[dict]:
+    """Take one pre-generated task out of the pool, oldest first."""
+    row = await _fetchrow(
+        """
+        DELETE FROM task_pool
+        WHERE id = (
+            SELECT id FROM task_pool
+            WHERE grade = $1 AND task_num = $2
+            ORDER BY created_at
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING task_text, correct_answer, solution
+        """,
+        grade, task_num,
+    )
+    return dict(row) if row else None
+
+
+async def add_pooled_task(
+    grade: int, task_num: int, topic: str, hint: str, task: dict
+) -> None:
+    await _execute(
+        """
+        INSERT INTO task_pool
+            (grade, task_num, topic, hint, task_text, correct_answer, solution)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+        """,
+        grade, task_num, topic, hint,
+        task["task_text"], task["correct_answer"], task.get("solution", ""),
+    )
+
+
+async def get_pool_counts() -> dict[tuple[int, int], int]:
+    """Current pool depth per (grade, task_num) bucket."""
+    rows = await _fetch(
+        "SELECT grade, task_num, COUNT(*) AS cnt FROM task_pool GROUP BY grade, task_num"
+    )
+    return {(r["grade"], r["task_num"]): r["cnt"] for r in rows}
+
+
+# ---------------------------------------------------------------------------
+# LLM response cache (see llm_cache.py)
+# ---------------------------------------------------------------------------
+
+# Keep the cache table bounded; oldest entries past this are dropped on write.
+_LLM_CACHE_MAX_ROWS = 10_000
+
+
+async def get_llm_cache(key: str) -> Optional[str]:
+    return await _fetchval(
+        "SELECT value FROM llm_cache WHERE key = $1 AND expires_at > NOW()",
+        key,
+    )
+
+
+async def set_llm_cache(key: str, value: str, ttl_days: int) -> None:
+    await _execute(
+        """
+        INSERT INTO llm_cache (key, value, expires_at)
+        VALUES ($1, $2, NOW() + make_interval(days => $3))
+        ON CONFLICT (key) DO UPDATE SET
+            value      = EXCLUDED.value,
+            created_at = NOW(),
+            expires_at = EXCLUDED.expires_at
+        """,
+        key, value, ttl_days,
+    )
+    await _execute(
+        """
+        DELETE FROM llm_cache
+        WHERE expires_at <= NOW()
+           OR key NOT IN (
+                SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT $1
+           )
+        """,
+        _LLM_CACHE_MAX_ROWS,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Task attempts (training mode)
 # ---------------------------------------------------------------------------
@@ -206,22 +406,46 @@ async def save_task_attempt(
     )
 
 
-async def get_task_stats(user_id: int, grade: int) -> list[dict]:
-    """Return per-task-type stats: total attempts and correct count."""
-    rows = await _fetch(
-        """
-        SELECT task_num, task_topic,
-               COUNT(*)                     AS total,
-               SUM(is_correct::int)         AS correct,
-               SUM(points_earned)           AS pts_earned,
-               SUM(points_max)              AS pts_max
-        FROM task_attempts
-        WHERE user_id = $1 AND grade = $2
-        GROUP BY task_num, task_topic
-        ORDER BY task_num
-        """,
-        user_id, grade,
-    )
+async def get_task_stats(
+    user_id: int, grade: int, task_nums: list[int] | None = None
+) -> list[dict]:
+    """Return per-task-type stats: total attempts and correct count.
+
+    With task_nums, one row comes back per listed task (zeros for types
+    never attempted), in that order — callers can zip against the VPR
+    structure instead of indexing a partial map.
+    """
+    if task_nums is not None:
+        rows = await _fetch(
+            """
+            SELECT t.num                              AS task_num,
+                   COUNT(a.id)                        AS total,
+                   COALESCE(SUM(a.is_correct::int), 0) AS correct,
+                   COALESCE(SUM(a.points_earned), 0)  AS pts_earned,
+                   COALESCE(SUM(a.points_max), 0)     AS pts_max
+            FROM unnest($3::int[]) AS t(num)
+            LEFT JOIN task_attempts a
+                   ON a.task_num = t.num AND a.user_id = $1 AND a.grade = $2
+            GROUP BY t.num
+            ORDER BY t.num
+            """,
+            user_id, grade, task_nums,
+        )
+    else:
+        rows = await _fetch(
+            """
+            SELECT task_num, task_topic,
+                   COUNT(*)                     AS total,
+                   SUM(is_correct::int)         AS correct,
+                   SUM(points_earned)           AS pts_earned,
+                   SUM(points_max)              AS pts_max
+            FROM task_attempts
+            WHERE user_id = $1 AND grade = $2
+            GROUP BY task_num, task_topic
+            ORDER BY task_num
+            """,
+            user_id, grade,
+        )
     return [dict(r) for r in rows]
 
 
@@ -277,7 +501,7 @@ async def complete_test_session(
         WHERE id = $5
         """,
         total_score, max_score, grade_mark,
-        json.dumps(tasks, ensure_ascii=False),
+        tasks,
         session_id,
     )
 
@@ -307,5 +531,5 @@ async def get_test_detail(session_id: int) -> Optional[dict]:
     result = dict(row)
     if result.get("tasks_json"):
         raw = result["tasks_json"]
-        result["tasks"] = json.loads(raw) if isinstance(raw, str) else raw
+        result["tasks"] = orjson.loads(raw) if isinstance(raw, str) else raw
     return result
@@ -2,13 +2,21 @@
 AI-based task generation, theory generation, and answer evaluation.
 """
 
+import asyncio
 import json
 import logging
+import math
 import os
-import re
+import string
+from collections import deque
+from fractions import Fraction
 
-from openai import AsyncOpenAI
+import httpx
+import orjson
+from openai import AsyncOpenAI, RateLimitError
 
+import database
+import llm_cache
 from config import OPENAI_API_KEY, OPENAI_MODEL, GOOGLE_AI_API_KEY, AI_PROVIDER
 
 logger = logging.getLogger(__name__)
@@ -17,10 +25,38 @@ _GOOGLE_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
 _GOOGLE_MODEL = os.getenv("GOOGLE_TEXT_MODEL", "gemini-2.0-flash")
 
 
+# Bound every request: a stalled call otherwise hangs its handler for
+# minutes. Retries are handled by our own loops with backoff, not the SDK.
+_REQUEST_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+_client: AsyncOpenAI | None = None
+
+
 def _get_client() -> AsyncOpenAI:
-    if AI_PROVIDER.lower() == "google":
-        return AsyncOpenAI(api_key=GOOGLE_AI_API_KEY, base_url=_GOOGLE_BASE_URL)
-    return AsyncOpenAI(api_key=OPENAI_API_KEY)
+    # One shared client: keepalive slots sized for bulk evaluation plus the
+    # refill worker, so concurrent calls reuse warm TLS connections instead
+    # of handshaking per request.
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=64,
+                max_keepalive_connections=64,
+                keepalive_expiry=30.0,
+            ),
+            timeout=_REQUEST_TIMEOUT,
+        )
+        if AI_PROVIDER.lower() == "google":
+            _client = AsyncOpenAI(
+                api_key=GOOGLE_AI_API_KEY, base_url=_GOOGLE_BASE_URL,
+                http_client=http_client, timeout=_REQUEST_TIMEOUT, max_retries=0,
+            )
+        else:
+            _client = AsyncOpenAI(
+                api_key=OPENAI_API_KEY,
+                http_client=http_client, timeout=_REQUEST_TIMEOUT, max_retries=0,
+            )
+    return _client
 
 
 def _get_model() -> str:
@@ -30,27 +66,113 @@ def _get_model() -> str:
 # Helpers
 # ---------------------------------------------------------------------------
 
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    """Exponential backoff (0.5, 1, 2 s), honouring Retry-After on 429s."""
+    if isinstance(exc, RateLimitError) and exc.response is not None:
+        retry_after = exc.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    return 0.5 * (2 ** attempt)
+
+
 def _extract_json(text: str) -> dict:
     """Extract first JSON object from a string (handles markdown code blocks)."""
-    # Strip markdown code fences if present
-    text = re.sub(r"```(?:json)?\s*", "", text).strip().rstrip("`").strip()
-    # Find first { ... }
     start = text.find("{")
-    end = text.rfind("}") + 1
-    if start == -1 or end == 0:
+    if start == -1:
         raise ValueError(f"No JSON object found in: {text[:200]}")
-    return json.loads(text[start:end])
-
-
-async def _chat(system: str, user: str, temperature: float = 0.8) -> str:
-    response = await _get_client().chat.completions.create(
-        model=_get_model(),
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-        temperature=temperature,
-    )
+    # Common case: the object runs to the end (modulo fence/whitespace
+    # tail) and orjson parses it in one C pass.
+    stripped = text[start:].rstrip().rstrip("`").rstrip()
+    try:
+        return orjson.loads(stripped)
+    except orjson.JSONDecodeError:
+        # Trailing prose: fall back to a forward raw_decode scan, which
+        # stops at the matching close brace.
+        obj, _ = _JSON_DECODER.raw_decode(text, start)
+        return obj
+
+
+# Single-flight map: concurrent identical requests share one in-flight
+# call instead of each hitting the API (common at school-class scale when
+# a whole class opens the same task at once). Only the first caller runs
+# the coroutine; the rest await its future at zero added latency.
+_inflight: dict[str, asyncio.Future] = {}
+
+
+async def _single_flight(key: str, coro) -> object:
+    fut = _inflight.get(key)
+    if fut is not None:
+        try:
+            # shield: one awaiting caller getting cancelled must not cancel
+            # the shared call out from under the others.
+            return await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            if not fut.cancelled():
+                # We were cancelled, not the shared call.
+                raise
+            # The leader was cancelled (e.g. its prefetch was dropped) and
+            # took the shared call down with it — fail over to our own call.
+            return await coro
+        finally:
+            coro.close()
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        result = await coro
+    except Exception as e:
+        fut.set_exception(e)
+        fut.exception()  # mark retrieved: the leader re-raises it itself
+        raise
+    else:
+        fut.set_result(result)
+        return result
+    finally:
+        _inflight.pop(key, None)
+        # Leader cancelled before completing: resolve the future anyway so
+        # followers blocked on it wake up and fail over.
+        if not fut.done():
+            fut.cancel()
+
+
+# Global cap on concurrent upstream calls, acquired at the single choke
+# point every request passes through. The per-feature semaphores bound
+# their own fan-outs; this one keeps the sum under provider rate limits.
+_LLM_SEM = asyncio.Semaphore(int(os.getenv("VPR_LLM_CONCURRENCY", "8")))
+
+
+async def _chat(
+    system: str,
+    user: str,
+    temperature: float = 0.8,
+    cache_key: str | None = None,
+    json_mode: bool = False,
+    max_tokens: int | None = None,
+) -> str:
+    kwargs: dict = {}
+    if json_mode:
+        kwargs["response_format"] = {"type": "json_object"}
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    # Route similar calls to the same provider-side prompt-cache shard
+    # (OpenAI only; the Gemini compatibility endpoint rejects the field).
+    if cache_key and AI_PROVIDER.lower() != "google":
+        kwargs["extra_body"] = {"prompt_cache_key": cache_key}
+    async with _LLM_SEM:
+        response = await _get_client().chat.completions.create(
+            model=_get_model(),
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            temperature=temperature,
+            **kwargs,
+        )
     return response.choices[0].message.content.strip()
 
 
@@ -58,52 +180,108 @@ async def _chat(system: str, user: str, temperature: float = 0.8) -> str:
 # Task generation
 # ---------------------------------------------------------------------------
 
-TASK_SYSTEM = (
-    "Ты — опытный учитель математики, составляющий задания для ВПР "
-    "(Всероссийской проверочной работы). "
-    "Задания должны точно соответствовать официальным демоверсиям ВПР, "
-    "быть чёткими, однозначными и иметь конкретный числовой ответ. "
-    "Отвечай ТОЛЬКО валидным JSON без дополнительных пояснений."
-)
-
-TASK_USER_TEMPLATE = """
-Создай задание для ВПР по математике.
-
-Класс: {grade}
-Номер задания: {task_num}
-Тема задания: {topic}
-Подсказка к типу: {hint}
+# All static instruction text lives in the system message so the prompt
+# prefix is byte-identical across calls — that is what provider-side
+# prompt caching keys on; only the short variable payload goes in the
+# user message.
+TASK_SYSTEM = """Ты — опытный учитель математики, составляющий задания для ВПР \
+(Всероссийской проверочной работы). \
+Задания должны точно соответствовать официальным демоверсиям ВПР, \
+быть чёткими, однозначными и иметь конкретный числовой ответ. \
+Отвечай ТОЛЬКО валидным JSON без дополнительных пояснений.
 
 Верни JSON строго в формате:
-{{
+{
   "task_text": "Полный текст задания для ученика (без ответа)",
   "correct_answer": "Точный правильный ответ (число, выражение или краткая фраза)",
   "solution": "Краткое решение/объяснение в 2–4 строки"
-}}
+}
 
 Требования:
 - Числа и условия задачи должны быть реалистичными
 - Ответ должен быть однозначным
 - Уровень сложности должен соответствовать ВПР
-- Используй разные числа каждый раз (это важно!)
-"""
+- Используй разные числа каждый раз (это важно!)"""
+
+# string.Template substitutes via one precompiled regex pass instead of
+# str.format's per-call field parsing.
+TASK_USER_TEMPLATE = string.Template("""
+Создай задание для ВПР по математике.
+
+Класс: $grade
+Номер задания: $task_num
+Тема задания: $topic
+Подсказка к типу: $hint
+""")
+
+
+# In-memory fallback pool for running without a database: same
+# pop/add/counts contract as the task_pool table, bounded per bucket so
+# an idle bot cannot accumulate tasks without limit.
+_memory_pool: dict[tuple[int, int], deque] = {}
+
+
+async def _pool_pop(grade: int, task_num: int) -> dict | None:
+    if database.is_available():
+        return await database.pop_pooled_task(grade, task_num)
+    bucket = _memory_pool.get((grade, task_num))
+    return bucket.popleft() if bucket else None
+
+
+async def _pool_add(grade: int, task_num: int, topic: str, hint: str, task: dict) -> None:
+    if database.is_available():
+        await database.add_pooled_task(grade, task_num, topic, hint, task)
+    else:
+        _memory_pool.setdefault((grade, task_num), deque(maxlen=32)).append(task)
+
+
+async def _pool_counts() -> dict:
+    if database.is_available():
+        return await database.get_pool_counts()
+    return {key: len(bucket) for key, bucket in _memory_pool.items()}
 
 
 async def generate_task(grade: int, task_num: int, topic: str, hint: str) -> dict:
     """
     Returns dict with keys: task_text, correct_answer, solution
     """
-    user_prompt = TASK_USER_TEMPLATE.format(
+    # Serve from the pre-generated pool when possible — a single pop
+    # instead of an OpenAI round-trip; the background loop refills it.
+    pooled = await _pool_pop(grade, task_num)
+    if pooled is not None:
+        return pooled
+    # Pool miss: coalesce the thundering herd — one live generation serves
+    # every caller asking for the same (grade, task_num, topic) right now.
+    return await _single_flight(
+        f"task:{grade}:{task_num}:{topic}",
+        _generate_task_live(grade, task_num, topic, hint),
+    )
+
+
+async def _generate_task_live(grade: int, task_num: int, topic: str, hint: str) -> dict:
+    user_prompt = TASK_USER_TEMPLATE.substitute(
         grade=grade, task_num=task_num, topic=topic, hint=hint
     )
     for attempt in range(3):
         try:
-            raw = await _chat(TASK_SYSTEM, user_prompt)
-            data = _extract_json(raw)
+            raw = await _chat(
+                TASK_SYSTEM, user_prompt,
+                cache_key=f"vpr:task:{grade}:{task_num}",
+                json_mode=True,
+                max_tokens=500,
+            )
+            # JSON mode guarantees a bare object; _extract_json stays as a
+            # belt-and-suspenders fallback for providers that ignore it.
+            try:
+                data = orjson.loads(raw)
+            except ValueError:
+                data = _extract_json(raw)
             if all(k in data for k in ("task_text", "correct_answer", "solution")):
                 return data
         except Exception as e:
             logger.warning("generate_task attempt %d failed: %s", attempt + 1, e)
+            if attempt < 2:
+                await asyncio.sleep(_retry_delay(e, attempt))
     raise RuntimeError("Failed to generate task after 3 attempts")
 
 
@@ -111,19 +289,9 @@ async def generate_task(grade: int, task_num: int, topic: str, hint: str) -> dic
 # Theory generation
 # ---------------------------------------------------------------------------
 
-THEORY_SYSTEM = (
-    "Ты — репетитор по математике для школьников. "
-    "Объясняй материал ясно, структурированно, с примерами. "
-    "Используй язык, понятный ученику соответствующего класса."
-)
-
-THEORY_USER_TEMPLATE = """
-Объясни теорию для задания ВПР по математике.
-
-Класс: {grade}
-Номер задания в ВПР: {task_num}
-Тема: {topic}
-Подсказка: {hint}
+THEORY_SYSTEM = """Ты — репетитор по математике для школьников. \
+Объясняй материал ясно, структурированно, с примерами. \
+Используй язык, понятный ученику соответствующего класса.
 
 Структура ответа (используй Markdown-подобное форматирование для Telegram HTML):
 1. <b>📖 Ключевые понятия</b> — основные термины и определения
@@ -132,44 +300,111 @@ THEORY_USER_TEMPLATE = """
 4. <b>✏️ Разобранный пример</b> — типичное задание с полным решением
 5. <b>⚠️ Типичные ошибки</b> — на что обратить внимание
 
-Пиши на русском языке. Ответ должен быть информативным, но компактным (не более 600 слов).
-"""
+Пиши на русском языке. Ответ должен быть информативным, но компактным (не более 600 слов)."""
+
+THEORY_USER_TEMPLATE = string.Template("""
+Объясни теорию для задания ВПР по математике.
+
+Класс: $grade
+Номер задания в ВПР: $task_num
+Тема: $topic
+Подсказка: $hint
+""")
 
 
 async def generate_theory(grade: int, task_num: int, topic: str, hint: str) -> str:
-    user_prompt = THEORY_USER_TEMPLATE.format(
+    # Theory for a given (grade, task_num, topic, hint) is near-deterministic
+    # and heavily reused — serve repeats from the cache, skipping the API call.
+    key = llm_cache.make_key(
+        model=_get_model(), grade=grade, task_num=task_num, topic=topic, hint=hint
+    )
+    cached = await llm_cache.get(key)
+    if cached is not None:
+        return cached
+    # Cache miss: single-flight so simultaneous misses for the same topic
+    # produce one API call, whose result then populates the cache for all.
+    return await _single_flight(
+        f"theory:{key}", _generate_theory_live(key, grade, task_num, topic, hint)
+    )
+
+
+async def _generate_theory_live(
+    key: str, grade: int, task_num: int, topic: str, hint: str
+) -> str:
+    user_prompt = THEORY_USER_TEMPLATE.substitute(
         grade=grade, task_num=task_num, topic=topic, hint=hint
     )
-    return await _chat(THEORY_SYSTEM, user_prompt, temperature=0.5)
+    theory = await _chat(
+        THEORY_SYSTEM, user_prompt, temperature=0.5,
+        cache_key=f"vpr:theory:{grade}:{task_num}",
+        max_tokens=1400,
+    )
+    await llm_cache.set(key, theory)
+    return theory
 
 
 # ---------------------------------------------------------------------------
 # Answer evaluation
 # ---------------------------------------------------------------------------
 
-EVAL_SYSTEM = (
-    "Ты — строгий, но справедливый учитель математики. "
-    "Оценивай ответ ученика объективно. "
-    "Засчитывай эквивалентные формы ответа (например, 2.5 и 5/2, или 'треугольник ABC' и 'ABC'). "
-    "Отвечай ТОЛЬКО валидным JSON без дополнительных пояснений."
-)
+def _parse_number(s: str) -> Fraction | None:
+    s = s.replace(",", ".").replace(" ", "")
+    try:
+        return Fraction(s)
+    except (ValueError, ZeroDivisionError):
+        try:
+            return Fraction(float(s))
+        except (ValueError, OverflowError):
+            return None
 
-EVAL_USER_TEMPLATE = """
-Оцени ответ ученика на задание ВПР по математике.
 
-Задание: {task_text}
-Правильный ответ: {correct_answer}
-Ответ ученика: {user_answer}
-Максимальный балл за задание: {max_points}
+def _local_equiv(correct: str, user: str) -> bool:
+    """True when the answers are deterministically equivalent.
+
+    Only a confident True short-circuits the LLM; a False still goes to
+    the model, so ambiguity here costs nothing but the saved call.
+    """
+    a = " ".join(correct.strip().lower().split())
+    b = " ".join(user.strip().lower().split())
+    if not a or not b:
+        return False
+    if a == b:
+        return True
+    na, nb = _parse_number(a), _parse_number(b)
+    if na is not None and nb is not None:
+        return na == nb or math.isclose(float(na), float(nb), rel_tol=1e-6)
+    # Semicolon-separated numeric lists ("3; 5; 7") compared as multisets
+    pa = [_parse_number(p) for p in a.split(";")]
+    pb = [_parse_number(p) for p in b.split(";")]
+    if len(pa) > 1 and len(pa) == len(pb) and None not in pa and None not in pb:
+        return sorted(pa) == sorted(pb)
+    # Last resort: equal after shedding surrounding punctuation
+    sa = a.strip(string.punctuation + " ")
+    sb = b.strip(string.punctuation + " ")
+    return bool(sa) and sa == sb
+
+
+EVAL_SYSTEM = """Ты — строгий, но справедливый учитель математики. \
+Оценивай ответ ученика объективно. \
+Засчитывай эквивалентные формы ответа (например, 2.5 и 5/2, или 'треугольник ABC' и 'ABC'). \
+Отвечай ТОЛЬКО валидным JSON без дополнительных пояснений.
 
 Верни JSON строго в формате:
-{{
-  "points": <число от 0 до {max_points}>,
+{
+  "points": <число от 0 до максимального балла за задание>,
   "is_correct": <true или false>,
   "verdict": "<одна строка: 'Верно ✅', 'Частично верно ⚠️' или 'Неверно ❌'>",
   "explanation": "<2–4 предложения: почему ответ верен/неверен и правильное решение>"
-}}
-"""
+}"""
+
+EVAL_USER_TEMPLATE = string.Template("""
+Оцени ответ ученика на задание ВПР по математике.
+
+Задание: $task_text
+Правильный ответ: $correct_answer
+Ответ ученика: $user_answer
+Максимальный балл за задание: $max_points
+""")
 
 
 async def evaluate_answer(
@@ -181,7 +416,32 @@ async def evaluate_answer(
     """
     Returns dict: points, is_correct, verdict, explanation
     """
-    user_prompt = EVAL_USER_TEMPLATE.format(
+    # Deterministic local check first — exact and numerically equivalent
+    # answers need no LLM call at all.
+    if _local_equiv(correct_answer, user_answer):
+        return {
+            "points": max_points,
+            "is_correct": True,
+            "verdict": "Верно ✅",
+            "explanation": f"Ответ совпадает с правильным: {correct_answer}",
+        }
+    # Students sharing the same wrong answer to the same task converge on
+    # one in-flight call (whole classes often make the same mistake).
+    key = "eval:" + llm_cache.make_key(
+        task=task_text, correct=correct_answer, user=user_answer, max=max_points
+    )
+    return await _single_flight(
+        key, _evaluate_answer_live(task_text, correct_answer, user_answer, max_points)
+    )
+
+
+async def _evaluate_answer_live(
+    task_text: str,
+    correct_answer: str,
+    user_answer: str,
+    max_points: int,
+) -> dict:
+    user_prompt = EVAL_USER_TEMPLATE.substitute(
         task_text=task_text,
         correct_answer=correct_answer,
         user_answer=user_answer,
@@ -189,13 +449,23 @@ async def evaluate_answer(
     )
     for attempt in range(3):
         try:
-            raw = await _chat(EVAL_SYSTEM, user_prompt, temperature=0.2)
-            data = _extract_json(raw)
+            raw = await _chat(
+                EVAL_SYSTEM, user_prompt, temperature=0.2,
+                cache_key="vpr:eval",
+                json_mode=True,
+                max_tokens=300,
+            )
+            try:
+                data = orjson.loads(raw)
+            except ValueError:
+                data = _extract_json(raw)
             if "points" in data and "is_correct" in data:
                 data["points"] = min(int(data["points"]), max_points)
                 return data
         except Exception as e:
             logger.warning("evaluate_answer attempt %d failed: %s", attempt + 1, e)
+            if attempt < 2:
+                await asyncio.sleep(_retry_delay(e, attempt))
     # Fallback: manual comparison
     norm_correct = correct_answer.strip().lower()
     norm_user = user_answer.strip().lower()
@@ -212,17 +482,161 @@ async def evaluate_answer(
 # Batch evaluation (used in test mode)
 # ---------------------------------------------------------------------------
 
-async def evaluate_all_answers(tasks: list[dict]) -> list[dict]:
+BULK_EVAL_SYSTEM = """Ты — строгий, но справедливый учитель математики. \
+Оцениваешь ответы ученика сразу на несколько заданий. \
+Засчитывай эквивалентные формы ответа (например, 2.5 и 5/2, или 'треугольник ABC' и 'ABC'). \
+Отвечай ТОЛЬКО валидным JSON без дополнительных пояснений.
+
+На входе JSON вида {"items": [{"id": ..., "task": ..., "correct": ..., "user": ..., "max": ...}, ...]}.
+
+Верни JSON строго в формате:
+{
+  "results": [
+    {
+      "id": <id из входа>,
+      "points": <число от 0 до max>,
+      "is_correct": <true или false>,
+      "verdict": "<одна строка: 'Верно ✅', 'Частично верно ⚠️' или 'Неверно ❌'>",
+      "explanation": "<2–4 предложения: почему ответ верен/неверен и правильное решение>"
+    }
+  ]
+}
+Верни ровно один результат на каждый входной элемент."""
+
+
+async def _evaluate_all_bulk(tasks: list[dict]) -> list[dict]:
+    """Grade a whole test in one request: one RTT and one system prompt."""
+    out: list[dict | None] = [None] * len(tasks)
+    items = []
+    for i, t in enumerate(tasks):
+        # Deterministic matches are settled locally and excluded from the
+        # payload, so the model only sees the ambiguous answers.
+        if _local_equiv(t["correct_answer"], t["user_answer"]):
+            out[i] = {
+                **t,
+                "points": t["max_points"],
+                "is_correct": True,
+                "verdict": "Верно ✅",
+                "explanation": f"Ответ совпадает с правильным: {t['correct_answer']}",
+            }
+        else:
+            items.append({
+                "id": i,
+                "task": t["task_text"],
+                "correct": t["correct_answer"],
+                "user": t["user_answer"],
+                "max": t["max_points"],
+            })
+    if items:
+        raw = await _chat(
+            BULK_EVAL_SYSTEM,
+            orjson.dumps({"items": items}).decode(),
+            temperature=0.2,
+            cache_key="vpr:eval:bulk",
+            json_mode=True,
+            max_tokens=300 * len(items),
+        )
+        results = {int(r["id"]): r for r in orjson.loads(raw)["results"]}
+        for item in items:
+            i = item["id"]
+            r = results[i]  # KeyError => malformed reply, caller falls back
+            t = tasks[i]
+            out[i] = {
+                **t,
+                "points": min(int(r["points"]), t["max_points"]),
+                "is_correct": bool(r["is_correct"]),
+                "verdict": r.get("verdict", "Неверно ❌"),
+                "explanation": r.get("explanation", ""),
+            }
+    return out
+
+
+# Bound the fan-out so a 20-task test doesn't trip provider rate limits;
+# gather still returns results in input order.
+_EVAL_SEM = asyncio.Semaphore(int(os.getenv("VPR_EVAL_CONCURRENCY", "8")))
+
+
+async def evaluate_all_answers(tasks: list[dict], on_result=None) -> list[dict]:
     """
     tasks: list of dicts with keys: task_text, correct_answer, user_answer, max_points
     Returns same list with added keys: points, is_correct, verdict, explanation
+
+    on_result: optional async callback (index, result) fired as each
+    verdict becomes available, so the UI can show grading progress
+    instead of waiting for the slowest task.
     """
-    import asyncio
+    if len(tasks) > 1:
+        try:
+            results = await _evaluate_all_bulk(tasks)
+        except Exception as e:
+            logger.warning("bulk evaluation failed, falling back to per-task: %s", e)
+        else:
+            if on_result is not None:
+                for i, res in enumerate(results):
+                    await on_result(i, res)
+            return results
+
+    async def eval_one(i: int, t: dict) -> tuple[int, dict]:
+        async with _EVAL_SEM:
+            result = await evaluate_answer(
+                t["task_text"], t["correct_answer"], t["user_answer"], t["max_points"]
+            )
+        return i, {**t, **result}
+
+    # as_completed pushes each verdict out the moment it resolves; the
+    # results list restores input order.
+    results: list[dict | None] = [None] * len(tasks)
+    for fut in asyncio.as_completed([eval_one(i, t) for i, t in enumerate(tasks)]):
+        i, res = await fut
+        results[i] = res
+        if on_result is not None:
+            await on_result(i, res)
+    return results
 
-    async def eval_one(t: dict) -> dict:
-        result = await evaluate_answer(
-            t["task_text"], t["correct_answer"], t["user_answer"], t["max_points"]
-        )
-        return {**t, **result}
 
-    return await asyncio.gather(*[eval_one(t) for t in tasks])
+# ---------------------------------------------------------------------------
+# Background pool refill
+# ---------------------------------------------------------------------------
+
+POOL_TARGET = int(os.getenv("VPR_POOL_TARGET", "5"))
+POOL_REFILL_INTERVAL = float(os.getenv("VPR_POOL_REFILL_INTERVAL", "60"))
+
+# Cap concurrent generation so refill never saturates OpenAI rate limits.
+_POOL_SEM = asyncio.Semaphore(8)
+
+
+async def _refill_bucket(
+    grade: int, task_num: int, topic: str, hint: str, missing: int
+) -> None:
+    for _ in range(missing):
+        async with _POOL_SEM:
+            try:
+                task = await _generate_task_live(grade, task_num, topic, hint)
+            except Exception as e:
+                logger.warning(
+                    "pool refill for grade %d task %d failed: %s", grade, task_num, e
+                )
+                return
+        await _pool_add(grade, task_num, topic, hint, task)
+
+
+async def pool_refill_loop() -> None:
+    """Keep every (grade, task_num) bucket topped up to POOL_TARGET."""
+    from vpr_data import VPR_STRUCTURE
+
+    while True:
+        try:
+            counts = await _pool_counts()
+            jobs = []
+            for grade, data in VPR_STRUCTURE.items():
+                for tt in data["task_types"]:
+                    missing = POOL_TARGET - counts.get((grade, tt["num"]), 0)
+                    if missing > 0:
+                        jobs.append(
+                            _refill_bucket(grade, tt["num"], tt["topic"], tt["hint"], missing)
+                        )
+            if jobs:
+                await asyncio.gather(*jobs)
+        except Exception:
+            logger.exception("pool refill cycle failed")
+        await asyncio.sleep(POOL_REFILL_INTERVAL)
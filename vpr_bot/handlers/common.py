@@ -26,6 +26,26 @@ WELCOME_TEXT = (
     "Выбери свой класс 👇"
 )
 
+# VPR_STRUCTURE is static, so the screen headers derived from it are
+# formatted once here instead of on every navigation click.
+_GRADE_HEADER = {
+    g: (
+        f"📚 <b>{d['grade_name']}</b>\n\n"
+        f"Контрольная: {d['tasks_count']} заданий · {d['time_minutes']} минут · "
+        f"макс. {d['max_score']} баллов\n\n"
+        "Что будем делать?"
+    )
+    for g, d in VPR_STRUCTURE.items()
+}
+
+_TRAIN_HEADER = {
+    g: (
+        f"🎯 <b>Тренировка — {d['grade_name']}</b>\n\n"
+        "Выбери тип задания для отработки:"
+    )
+    for g, d in VPR_STRUCTURE.items()
+}
+
 
 # ---------------------------------------------------------------------------
 # /start
@@ -55,73 +75,46 @@ async def nav_grades(call: CallbackQuery, state: FSMContext) -> None:
     await call.answer()
 
 
+# The four screens below differ only in where grade comes from and which
+# screen they render, so the rendering is shared; each handler does at
+# most one FSM read.
+
+async def _show_mode(call: CallbackQuery, state: FSMContext, grade: int) -> None:
+    await state.set_state(VPRStates.choosing_mode)
+    await call.message.edit_text(_GRADE_HEADER[grade], reply_markup=kb_mode(grade))
+    await call.answer()
+
+
+async def _show_task_types(call: CallbackQuery, state: FSMContext, grade: int) -> None:
+    await state.set_state(VPRStates.choosing_task_type)
+    await call.message.edit_text(_TRAIN_HEADER[grade], reply_markup=kb_task_types(grade))
+    await call.answer()
+
+
 @router.callback_query(F.data.startswith("grade:"))
 async def select_grade(call: CallbackQuery, state: FSMContext) -> None:
     grade = int(call.data.split(":")[1])
-    data = VPR_STRUCTURE[grade]
     await state.update_data(grade=grade)
-    await state.set_state(VPRStates.choosing_mode)
-    text = (
-        f"📚 <b>{data['grade_name']}</b>\n\n"
-        f"Контрольная: {data['tasks_count']} заданий · {data['time_minutes']} минут · "
-        f"макс. {data['max_score']} баллов\n\n"
-        "Что будем делать?"
-    )
-    await call.message.edit_text(text, reply_markup=kb_mode(grade))
-    await call.answer()
+    await _show_mode(call, state, grade)
 
 
 @router.callback_query(F.data == "nav:mode")
 async def nav_mode(call: CallbackQuery, state: FSMContext) -> None:
-    data = await state.get_data()
-    grade = data.get("grade")
+    grade = (await state.get_data()).get("grade")
     if not grade:
         await nav_grades(call, state)
         return
-    vpr = VPR_STRUCTURE[grade]
-    await state.set_state(VPRStates.choosing_mode)
-    text = (
-        f"📚 <b>{vpr['grade_name']}</b>\n\n"
-        f"Контрольная: {vpr['tasks_count']} заданий · {vpr['time_minutes']} минут · "
-        f"макс. {vpr['max_score']} баллов\n\n"
-        "Что будем делать?"
-    )
-    await call.message.edit_text(text, reply_markup=kb_mode(grade))
-    await call.answer()
+    await _show_mode(call, state, grade)
 
 
 @router.callback_query(F.data == "nav:task_types")
-async def nav_task_types(call: CallbackQuery, state: FSMContext) -> None:
-    data = await state.get_data()
-    grade = data.get("grade")
-    if not grade:
-        await nav_grades(call, state)
-        return
-    vpr = VPR_STRUCTURE[grade]
-    await state.set_state(VPRStates.choosing_task_type)
-    text = (
-        f"🎯 <b>Тренировка — {vpr['grade_name']}</b>\n\n"
-        "Выбери тип задания для отработки:"
-    )
-    await call.message.edit_text(text, reply_markup=kb_task_types(grade))
-    await call.answer()
-
-
 @router.callback_query(F.data == "mode:train")
-async def mode_train(call: CallbackQuery, state: FSMContext) -> None:
-    data = await state.get_data()
-    grade = data.get("grade")
+async def nav_task_types(call: CallbackQuery, state: FSMContext) -> None:
+    grade = (await state.get_data()).get("grade")
     if not grade:
         await nav_grades(call, state)
         return
-    vpr = VPR_STRUCTURE[grade]
-    await state.set_state(VPRStates.choosing_task_type)
-    text = (
-        f"🎯 <b>Тренировка — {vpr['grade_name']}</b>\n\n"
-        "Выбери тип задания для отработки:"
-    )
-    await call.message.edit_text(text, reply_markup=kb_task_types(grade))
-    await call.answer()
+    await _show_task_types(call, state, grade)
 
 
 @router.callback_query(F.data == "nav:stats")
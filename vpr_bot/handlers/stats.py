@@ -17,16 +17,54 @@ from vpr_data import VPR_STRUCTURE, grade_emoji
 router = Router()
 logger = logging.getLogger(__name__)
 
+_DASH30 = "─" * 30
 
-def _pct_bar(correct: int, total: int, width: int = 10) -> str:
+# Per-grade task numbers, in display order, for the pushed-down stats query.
+_TASK_NUMS = {g: [t["num"] for t in d["task_types"]] for g, d in VPR_STRUCTURE.items()}
+
+_BAR_WIDTH = 10
+# All eleven possible bars, prebuilt — rendering becomes a tuple index
+# instead of two string multiplications and a concat per task.
+_BARS = tuple("█" * f + "░" * (_BAR_WIDTH - f) for f in range(_BAR_WIDTH + 1))
+
+
+def _pct_bar(correct: int, total: int, width: int = _BAR_WIDTH) -> str:
     if total == 0:
         return "░" * width + " нет данных"
     pct = correct / total
     filled = round(width * pct)
-    bar = "█" * filled + "░" * (width - filled)
+    bar = _BARS[filled] if width == _BAR_WIDTH else "█" * filled + "░" * (width - filled)
     return f"[{bar}] {round(pct * 100)}%"
 
 
+def _fmt_dt(value) -> str:
+    """Render completed_at as "dd.mm.yyyy HH:MM" without strftime.
+
+    asyncpg returns datetime objects; ISO strings are sliced at their
+    fixed offsets, with no exception-driven control flow per row.
+    """
+    if isinstance(value, datetime):
+        return (
+            f"{value.day:02d}.{value.month:02d}.{value.year} "
+            f"{value.hour:02d}:{value.minute:02d}"
+        )
+    if isinstance(value, str) and len(value) >= 16:
+        return f"{value[8:10]}.{value[5:7]}.{value[0:4]} {value[11:13]}:{value[14:16]}"
+    return "—"
+
+
+def _truncate(text: str, suffix: str) -> str:
+    """Cap at Telegram's 4096 limit, cutting on a line break and closing
+    any <b> left open by the cut."""
+    if len(text) <= 4096:
+        return text
+    cut = text.rfind("\n", 0, 4050)
+    head = text[: cut if cut != -1 else 4050]
+    if head.count("<b>") > head.count("</b>"):
+        head += "</b>"
+    return head + suffix
+
+
 # ---------------------------------------------------------------------------
 # Stats for a specific grade
 # ---------------------------------------------------------------------------
@@ -38,13 +76,18 @@ async def stats_by_grade(call: CallbackQuery, state: FSMContext) -> None:
     await call.answer()
 
     try:
-        rows = await get_task_stats(call.from_user.id, grade)
+        rows = await get_task_stats(call.from_user.id, grade, _TASK_NUMS[grade])
     except Exception as e:
         logger.error("get_task_stats failed: %s", e)
         await call.message.edit_text("😕 Не удалось загрузить статистику.", reply_markup=kb_stats_back())
         return
 
-    if not rows:
+    total_attempts = total_correct = 0
+    for r in rows:
+        total_attempts += r["total"]
+        total_correct += r["correct"]
+
+    if not total_attempts:
         await call.message.edit_text(
             f"📊 <b>Статистика — {vpr['grade_name']}</b>\n\n"
             "Ты ещё не решал задания этого класса.\n"
@@ -53,40 +96,32 @@ async def stats_by_grade(call: CallbackQuery, state: FSMContext) -> None:
         )
         return
 
-    # Build per-task map
-    stats_map = {r["task_num"]: r for r in rows}
-
-    total_attempts = sum(r["total"] for r in rows)
-    total_correct = sum(r["correct"] for r in rows)
-    total_pts = sum(r["pts_earned"] for r in rows)
-    total_pts_max = sum(r["pts_max"] for r in rows)
-
-    lines = [
-        f"📊 <b>Статистика — {vpr['grade_name']}</b>\n",
+    header = (
+        f"📊 <b>Статистика — {vpr['grade_name']}</b>\n\n"
         f"Всего попыток: <b>{total_attempts}</b> · "
-        f"Верных: <b>{total_correct}</b> ({round(total_correct / total_attempts * 100) if total_attempts else 0}%)\n",
-        "─" * 30,
-    ]
+        f"Верных: <b>{total_correct}</b> ({round(total_correct / total_attempts * 100) if total_attempts else 0}%)\n\n"
+        f"{_DASH30}"
+    )
 
-    for t in vpr["task_types"]:
+    # The query returns one row per task type, aligned with task_types.
+    entries = []
+    for t, s in zip(vpr["task_types"], rows):
         n = t["num"]
-        s = stats_map.get(n)
-        if s:
+        if s["total"]:
             bar = _pct_bar(s["correct"], s["total"])
             pts_info = f"{s['pts_earned']}/{s['pts_max']} балл."
-            lines.append(
-                f"\n<b>№{n}</b> {t['topic']}\n"
+            entries.append(
+                f"<b>№{n}</b> {t['topic']}\n"
                 f"   {bar}  ({s['correct']}/{s['total']})  {pts_info}"
             )
         else:
-            lines.append(
-                f"\n<b>№{n}</b> {t['topic']}\n"
-                f"   [{'░' * 10}] не тренировалось"
+            entries.append(
+                f"<b>№{n}</b> {t['topic']}\n"
+                f"   [{_BARS[0]}] не тренировалось"
             )
 
-    text = "\n".join(lines)
-    if len(text) > 4096:
-        text = text[:4050] + "\n\n<i>…</i>"
+    text = header + "\n\n" + "\n\n".join(entries)
+    text = _truncate(text, "\n\n<i>…</i>")
 
     await call.message.edit_text(text, reply_markup=kb_stats_back())
 
@@ -130,7 +165,7 @@ async def stats_history(call: CallbackQuery, state: FSMContext) -> None:
         )
         return
 
-    lines = ["📜 <b>История контрольных</b>\n", "─" * 30]
+    entries = []
 
     for h in history:
         grade = h["grade"]
@@ -142,20 +177,14 @@ async def stats_history(call: CallbackQuery, state: FSMContext) -> None:
         max_s = h["max_score"]
         mode_label = "⏱" if h["mode"] == "timed" else "🧘"
 
-        # Parse date
-        try:
-            dt = datetime.fromisoformat(h["completed_at"])
-            date_str = dt.strftime("%d.%m.%Y %H:%M")
-        except Exception:
-            date_str = h.get("completed_at", "—")
+        date_str = _fmt_dt(h["completed_at"])
 
-        lines.append(
-            f"\n{emoji_m} <b>«{mark}»</b>  {grade_name}  {mode_label}\n"
+        entries.append(
+            f"{emoji_m} <b>«{mark}»</b>  {grade_name}  {mode_label}\n"
             f"   {date_str}  ·  {score}/{max_s} баллов"
         )
 
-    text = "\n".join(lines)
-    if len(text) > 4096:
-        text = text[:4050] + "\n\n<i>… (показаны последние 20)</i>"
+    text = "📜 <b>История контрольных</b>\n\n" + _DASH30 + "\n\n" + "\n\n".join(entries)
+    text = _truncate(text, "\n\n<i>… (показаны последние 20)</i>")
 
     await call.message.edit_text(text, reply_markup=kb_stats_back())
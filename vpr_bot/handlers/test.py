@@ -4,15 +4,23 @@ Timed mode   — no per-task feedback, score + grade at the end.
 Practice mode — brief feedback after each task, grade at the end.
 """
 
+import asyncio
 import logging
-from datetime import datetime
+import time
+from operator import itemgetter
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 
-from database import complete_test_session, create_test_session, get_test_detail, upsert_user
-from generator import evaluate_all_answers, generate_task
+from database import (
+    complete_test_session,
+    create_test_session,
+    detach_connection,
+    get_test_detail,
+    upsert_user,
+)
+from generator import evaluate_all_answers, evaluate_answer, generate_task
 from keyboards import (
     kb_test_answer_sent,
     kb_test_detail_back,
@@ -21,11 +29,71 @@ from keyboards import (
     kb_test_start,
 )
 from states import VPRStates
+from ui import iter_html_chunks, score_bar
 from vpr_data import VPR_STRUCTURE, calculate_grade, get_task_type, grade_emoji
 
 router = Router()
 logger = logging.getLogger(__name__)
 
+# Static fragments of the per-task screen, assembled once instead of on
+# every task render.
+_SEP = "─" * 30
+_TASK_FOOTER = f"\n\n{_SEP}\n✏️ <i>Напиши ответ в чат</i>"
+
+# The grading scale as shown on the results screen, rendered once per
+# (grade, mark) pair — at most four marks per grade — with the ← marker
+# already on the achieved row.
+_GRADING_TABLES = {
+    (g, m): "".join(
+        f"{grade_emoji(mm)} «{mm}»: {mn}–{mx} баллов {'←' if mm == m else '  '}\n"
+        for mm, mn, mx in d["grading"]
+    )
+    for g, d in VPR_STRUCTURE.items()
+    for m, _, _ in d["grading"]
+}
+
+# Background tasks keep a strong reference here so the event loop cannot
+# garbage-collect them mid-flight.
+_bg_tasks: set[asyncio.Task] = set()
+
+# Verdicts produced by background practice evaluations, keyed
+# (chat_id, answer index). Kept out of FSM state so the background task
+# never races the handler's own state writes; merged back in _finish_test.
+_practice_results: dict[tuple[int, int], dict] = {}
+
+
+async def _detached(coro):
+    # The spawned task inherits the handler's context — including its
+    # pinned DB connection, which the middleware releases as soon as the
+    # handler returns. Detach so queries here acquire their own.
+    detach_connection()
+    return await coro
+
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(_detached(coro))
+    _bg_tasks.add(task)
+    task.add_done_callback(_bg_tasks.discard)
+
+
+# Next-task generation started while the student reads the current task,
+# keyed by chat id: (task index, asyncio.Task). Task handles are not
+# serializable, so they live here rather than in FSM state.
+_prefetched: dict[int, tuple[int, asyncio.Task]] = {}
+
+
+def _retrieve_exc(task: asyncio.Task) -> None:
+    # Mark a failed prefetch as observed; the consumer falls back to live
+    # generation, so the failure must not warn at garbage collection.
+    if not task.cancelled():
+        task.exception()
+
+
+def _drop_prefetch(chat_id: int) -> None:
+    pre = _prefetched.pop(chat_id, None)
+    if pre is not None:
+        pre[1].cancel()
+
 
 # ---------------------------------------------------------------------------
 # Show test overview
@@ -63,14 +131,24 @@ async def _start_test(call: CallbackQuery, state: FSMContext, mode: str) -> None
     await upsert_user(call.from_user.id, call.from_user.username, call.from_user.first_name)
     session_id = await create_test_session(call.from_user.id, grade, mode)
 
+    # Drop leftovers from an abandoned earlier test in this chat.
+    chat_id = call.message.chat.id
+    _drop_prefetch(chat_id)
+    for key in [k for k in _practice_results if k[0] == chat_id]:
+        _practice_results.pop(key, None)
+
     await state.set_state(VPRStates.test_in_progress)
-    await state.update_data(
+    # update_data returns the merged dict — thread it down instead of
+    # re-reading the storage in _send_next_task.
+    data = await state.update_data(
         test_mode=mode,
         test_session_id=session_id,
         test_grade=grade,
         test_current_idx=0,                 # 0-based index of current task
         test_answers=[],                     # accumulated answers
-        test_start_time=datetime.now().isoformat(),
+        # Monotonic float: immune to wall-clock jumps and needs no parsing
+        # on every task render. The DB keeps its own started_at timestamp.
+        test_start_monotonic=time.monotonic(),
     )
 
     mode_label = "⏱ на время" if mode == "timed" else "🧘 без таймера"
@@ -82,25 +160,25 @@ async def _start_test(call: CallbackQuery, state: FSMContext, mode: str) -> None
     )
     await call.answer()
 
-    await _send_next_task(call.message, state)
-
+    await _send_next_task(call.message, state, data)
 
-@router.callback_query(F.data == "test:timed")
-async def start_timed(call: CallbackQuery, state: FSMContext) -> None:
-    await _start_test(call, state, "timed")
 
-
-@router.callback_query(F.data == "test:practice")
-async def start_practice(call: CallbackQuery, state: FSMContext) -> None:
-    await _start_test(call, state, "practice")
+# One registration (and one filter evaluation per update) for both start
+# buttons; the suffix is the mode itself.
+@router.callback_query(F.data.in_({"test:timed", "test:practice"}))
+async def start_test(call: CallbackQuery, state: FSMContext) -> None:
+    await _start_test(call, state, call.data.split(":", 1)[1])
 
 
 # ---------------------------------------------------------------------------
 # Send next task
 # ---------------------------------------------------------------------------
 
-async def _send_next_task(message: Message, state: FSMContext) -> None:
-    data = await state.get_data()
+async def _send_next_task(
+    message: Message, state: FSMContext, data: dict | None = None
+) -> None:
+    if data is None:
+        data = await state.get_data()
     grade = data["test_grade"]
     idx = data["test_current_idx"]
     vpr = VPR_STRUCTURE[grade]
@@ -113,14 +191,29 @@ async def _send_next_task(message: Message, state: FSMContext) -> None:
     task_type = task_types[idx]
     task_num = task_type["num"]
     total = vpr["tasks_count"]
-
+    chat_id = message.chat.id
+
+    # Use the task prefetched while the student answered the previous one,
+    # if it matches; otherwise generate live.
+    task = None
+    pre = _prefetched.pop(chat_id, None)
+    if pre is not None:
+        pre_idx, pre_task = pre
+        if pre_idx == idx:
+            try:
+                task = await pre_task
+            except Exception as e:
+                logger.warning("prefetched task failed, regenerating: %s", e)
+        else:
+            pre_task.cancel()
     try:
-        task = await generate_task(
-            grade=grade,
-            task_num=task_num,
-            topic=task_type["topic"],
-            hint=task_type["hint"],
-        )
+        if task is None:
+            task = await generate_task(
+                grade=grade,
+                task_num=task_num,
+                topic=task_type["topic"],
+                hint=task_type["hint"],
+            )
     except Exception as e:
         logger.error("generate_task in test failed: %s", e)
         await message.edit_text(
@@ -135,9 +228,10 @@ async def _send_next_task(message: Message, state: FSMContext) -> None:
             "correct_answer": "",
             "user_answer": "(пропущено)",
             "max_points": task_type["max_points"],
+            "points": 0,
         })
-        await state.update_data(test_answers=answers, test_current_idx=idx + 1)
-        await _advance_or_finish(message, state)
+        data = await state.update_data(test_answers=answers, test_current_idx=idx + 1)
+        await _advance_or_finish(message, state, data)
         return
 
     # Store current task info in state
@@ -156,8 +250,7 @@ async def _send_next_task(message: Message, state: FSMContext) -> None:
 
     # Time hint for timed mode
     if mode == "timed":
-        start_dt = datetime.fromisoformat(data["test_start_time"])
-        elapsed = int((datetime.now() - start_dt).total_seconds())
+        elapsed = int(time.monotonic() - data["test_start_monotonic"])
         time_limit = vpr["time_minutes"] * 60
         remaining = max(0, time_limit - elapsed)
         mins, secs = divmod(remaining, 60)
@@ -168,14 +261,28 @@ async def _send_next_task(message: Message, state: FSMContext) -> None:
     text = (
         f"📝 <b>{progress}</b>\n"
         f"{time_info}"
-        f"{'─' * 30}\n\n"
+        f"{_SEP}\n\n"
         f"<b>№{task_num}. {task_type['topic']}</b>\n\n"
-        f"{task['task_text']}\n\n"
-        f"{'─' * 30}\n"
-        f"✏️ <i>Напиши ответ в чат</i>"
+        f"{task['task_text']}"
+        f"{_TASK_FOOTER}"
     )
     await message.edit_text(text)
 
+    # Start generating the next task now — it resolves while the student
+    # reads and answers, so the "next" tap rarely waits on the LLM.
+    next_idx = idx + 1
+    if next_idx < len(task_types):
+        nt = task_types[next_idx]
+        pre_task = asyncio.create_task(
+            _detached(
+                generate_task(
+                    grade=grade, task_num=nt["num"], topic=nt["topic"], hint=nt["hint"]
+                )
+            )
+        )
+        pre_task.add_done_callback(_retrieve_exc)
+        _prefetched[chat_id] = (next_idx, pre_task)
+
 
 # ---------------------------------------------------------------------------
 # Receive answer during test
@@ -192,8 +299,9 @@ async def receive_test_answer(message: Message, state: FSMContext) -> None:
     user_answer = message.text.strip()
     answers = data.get("test_answers", [])
 
-    # Append answer (evaluation happens later or now depending on mode)
-    entry = {**current_task, "user_answer": user_answer}
+    # Append answer; "points" starts at 0 so the scoring pass can index
+    # unconditionally, and evaluation overwrites it later.
+    entry = {**current_task, "user_answer": user_answer, "points": 0}
     answers.append(entry)
 
     idx = data["test_current_idx"]
@@ -204,37 +312,12 @@ async def receive_test_answer(message: Message, state: FSMContext) -> None:
     await state.update_data(test_answers=answers, test_current_idx=idx + 1)
 
     if mode == "practice":
-        # Evaluate immediately and show brief feedback
-        from generator import evaluate_answer
-        try:
-            result = await evaluate_answer(
-                current_task["task_text"],
-                current_task["correct_answer"],
-                user_answer,
-                current_task["max_points"],
-            )
-        except Exception:
-            result = {
-                "points": 0, "is_correct": False,
-                "verdict": "⚠️ Ошибка проверки",
-                "explanation": f"Правильный ответ: {current_task['correct_answer']}",
-            }
-
-        # Update the stored entry with points
-        answers[-1].update(result)
-        await state.update_data(test_answers=answers)
-
-        pts = result["points"]
-        max_pts = current_task["max_points"]
-        filled = "🟩" * pts + "⬜" * (max_pts - pts)
-
-        feedback = (
-            f"{result['verdict']}\n"
-            f"{filled} <b>{pts}/{max_pts}</b>\n\n"
-            f"{result['explanation']}"
-        )
+        # Feedback is evaluated in the background and posted when ready,
+        # so the LLM round-trip never blocks moving on to the next task.
+        _spawn(_practice_feedback(message, current_task, user_answer, idx))
         await message.answer(
-            feedback,
+            f"✅ Ответ принят, проверяю…\n\n"
+            f"Выполнено: <b>{idx + 1}/{total}</b>",
             reply_markup=kb_test_answer_sent(idx + 1, total, mode),
         )
     else:
@@ -246,6 +329,31 @@ async def receive_test_answer(message: Message, state: FSMContext) -> None:
         )
 
 
+async def _practice_feedback(
+    message: Message, task: dict, user_answer: str, pos: int
+) -> None:
+    """Evaluate one practice answer off the critical path and post feedback."""
+    try:
+        result = await evaluate_answer(
+            task["task_text"], task["correct_answer"], user_answer, task["max_points"]
+        )
+    except Exception:
+        logger.exception("background practice evaluation failed")
+        return
+    _practice_results[(message.chat.id, pos)] = result
+
+    pts = result["points"]
+    max_pts = task["max_points"]
+    try:
+        await message.answer(
+            f"{result['verdict']}\n"
+            f"{score_bar(pts, max_pts)} <b>{pts}/{max_pts}</b>\n\n"
+            f"{result['explanation']}"
+        )
+    except Exception as e:
+        logger.warning("practice feedback send failed: %s", e)
+
+
 # ---------------------------------------------------------------------------
 # Next task (callback)
 # ---------------------------------------------------------------------------
@@ -253,22 +361,38 @@ async def receive_test_answer(message: Message, state: FSMContext) -> None:
 @router.callback_query(F.data == "test:next", VPRStates.test_in_progress)
 async def test_next(call: CallbackQuery, state: FSMContext) -> None:
     await call.answer()
-    await call.message.edit_text("⏳ Загружаю следующее задание…")
-    await _send_next_task(call.message, state)
+    data = await state.get_data()
+    # Show the loading placeholder only when the next task is not already
+    # sitting in the prefetch — otherwise _send_next_task edits the
+    # message exactly once, halving Telegram calls on the hot path.
+    pre = _prefetched.get(call.message.chat.id)
+    warm = (
+        pre is not None
+        and pre[0] == data["test_current_idx"]
+        and pre[1].done()
+        and not pre[1].cancelled()
+        and pre[1].exception() is None
+    )
+    if not warm:
+        await call.message.edit_text("⏳ Загружаю следующее задание…")
+    await _send_next_task(call.message, state, data)
 
 
 # ---------------------------------------------------------------------------
 # Finish test
 # ---------------------------------------------------------------------------
 
-async def _advance_or_finish(message: Message, state: FSMContext) -> None:
-    data = await state.get_data()
+async def _advance_or_finish(
+    message: Message, state: FSMContext, data: dict | None = None
+) -> None:
+    if data is None:
+        data = await state.get_data()
     idx = data["test_current_idx"]
     vpr = VPR_STRUCTURE[data["test_grade"]]
     if idx < vpr["tasks_count"]:
-        await _send_next_task(message, state)
+        await _send_next_task(message, state, data)
     else:
-        await _finish_test(message, state)
+        await _finish_test(message, state, data)
 
 
 @router.callback_query(F.data == "test:finish")
@@ -278,37 +402,86 @@ async def test_finish_callback(call: CallbackQuery, state: FSMContext) -> None:
     await _finish_test(call.message, state)
 
 
-async def _finish_test(message: Message, state: FSMContext) -> None:
-    data = await state.get_data()
+async def _complete_session_bg(
+    session_id: int, total_score: int, max_score: int, mark: int, answers: list[dict]
+) -> None:
+    try:
+        await complete_test_session(session_id, total_score, max_score, mark, answers)
+    except Exception as e:
+        logger.warning("complete_test_session failed: %s", e)
+
+
+async def _finish_test(
+    message: Message, state: FSMContext, data: dict | None = None
+) -> None:
+    if data is None:
+        data = await state.get_data()
     grade = data["test_grade"]
     mode = data.get("test_mode", "practice")
     session_id = data["test_session_id"]
     answers = data.get("test_answers", [])
+    # Bind the structure fields once — _finish_test touches them from
+    # several branches and the grading loop below.
     vpr = VPR_STRUCTURE[grade]
+    max_score = vpr["max_score"]
+    grade_name = vpr["grade_name"]
+    time_limit = vpr["time_minutes"] * 60
 
-    start_dt = datetime.fromisoformat(data["test_start_time"])
-    elapsed_sec = int((datetime.now() - start_dt).total_seconds())
+    elapsed_sec = int(time.monotonic() - data["test_start_monotonic"])
     elapsed_str = f"{elapsed_sec // 60}:{elapsed_sec % 60:02d}"
 
-    # For timed mode, evaluate all answers now (batch)
-    if mode == "timed":
+    # Merge verdicts the background practice evaluations already produced,
+    # then batch-grade whatever is still missing (all of timed mode, plus
+    # any practice answers whose evaluation has not landed yet).
+    chat_id = message.chat.id
+    _drop_prefetch(chat_id)
+    for i, a in enumerate(answers):
+        result = _practice_results.pop((chat_id, i), None)
+        if result is not None and "verdict" not in a:
+            a.update(result)
+
+    # Only the entries still missing a verdict go to the evaluator —
+    # re-grading the already-verdicted ones would pay LLM tokens again
+    # and could overwrite feedback the student has already seen.
+    pending = [(i, a) for i, a in enumerate(answers) if "verdict" not in a]
+    if pending:
+        graded = 0
+        total_tasks = len(pending)
+
+        async def _on_result(i: int, res: dict) -> None:
+            nonlocal graded
+            graded += 1
+            # Best effort: the originating message may not be editable.
+            try:
+                await message.edit_text(
+                    f"⏳ <b>Проверяю ответы…</b> {graded}/{total_tasks}"
+                )
+            except Exception:
+                pass
+
         try:
-            answers = await evaluate_all_answers(answers)
+            results = await evaluate_all_answers(
+                [a for _, a in pending], on_result=_on_result
+            )
         except Exception as e:
             logger.error("batch evaluation failed: %s", e)
+        else:
+            for (i, _), res in zip(pending, results):
+                answers[i] = res
 
-    total_score = sum(a.get("points", 0) for a in answers)
-    max_score = vpr["max_score"]
+    total_score = sum(map(itemgetter("points"), answers))
     mark = calculate_grade(grade, total_score)
     emoji = grade_emoji(mark)
 
-    # Save to DB
-    try:
-        await complete_test_session(session_id, total_score, max_score, mark, answers)
-    except Exception as e:
-        logger.warning("complete_test_session failed: %s", e)
+    # Persist off the critical path — the student sees the results screen
+    # without waiting out a DB round-trip.
+    _spawn(_complete_session_bg(session_id, total_score, max_score, mark, answers))
 
     await state.set_state(VPRStates.viewing_test_results)
+    # The finished test's payload is no longer needed in FSM state — the
+    # session row carries it now, and the detail view reads from the DB.
+    # Keeping it would pin several KB of task texts per chat in storage.
+    await state.update_data(test_answers=[], test_current_task=None)
 
     # Build results message
     pct = round(total_score / max_score * 100) if max_score else 0
@@ -317,26 +490,22 @@ async def _finish_test(message: Message, state: FSMContext) -> None:
     bar = "█" * filled + "░" * (bar_len - filled)
 
     time_warning = ""
-    if mode == "timed" and elapsed_sec > vpr["time_minutes"] * 60:
-        over = elapsed_sec - vpr["time_minutes"] * 60
+    if mode == "timed" and elapsed_sec > time_limit:
+        over = elapsed_sec - time_limit
         time_warning = f"\n⚠️ <i>Превышено время на {over // 60}:{over % 60:02d}</i>"
 
     result_text = (
         f"{emoji} <b>Контрольная завершена!</b>\n\n"
-        f"Класс: <b>{vpr['grade_name']}</b>\n"
+        f"Класс: <b>{grade_name}</b>\n"
         f"Режим: {'⏱ На время' if mode == 'timed' else '🧘 Тренировка'}\n"
         f"Время: {elapsed_str}{time_warning}\n\n"
-        f"{'─' * 30}\n"
+        f"{_SEP}\n"
         f"Баллы: <b>{total_score}</b> из <b>{max_score}</b>\n"
         f"[{bar}] {pct}%\n\n"
         f"🏆 <b>Оценка: {mark}</b>\n\n"
+        f"{_GRADING_TABLES[(grade, mark)]}"  # grading context, precomputed
     )
 
-    # Grading context
-    for m, mn, mx in vpr["grading"]:
-        marker = "←" if m == mark else "  "
-        result_text += f"{grade_emoji(m)} «{m}»: {mn}–{mx} баллов {marker}\n"
-
     await message.edit_text(
         result_text,
         reply_markup=kb_test_results(session_id),
@@ -369,7 +538,7 @@ async def show_test_detail(call: CallbackQuery, state: FSMContext) -> None:
     lines = [
         f"📋 <b>Подробный разбор — {vpr['grade_name']}</b>\n",
         f"Итого: {session['total_score']}/{session['max_score']} баллов · Оценка «{session['grade_mark']}»\n",
-        "─" * 30,
+        _SEP,
     ]
 
     for t in tasks:
@@ -388,13 +557,13 @@ async def show_test_detail(call: CallbackQuery, state: FSMContext) -> None:
             f"   Баллы: {pts}/{max_pts}"
         )
 
-    detail_text = "\n".join(lines)
+    # Paginate at line boundaries with <b>/<i>/<code> re-balanced across
+    # the seams, so Telegram parses every message independently.
+    chunks = list(iter_html_chunks(lines, limit=3900))
 
-    # Split if too long
-    if len(detail_text) <= 4096:
-        await call.message.edit_text(detail_text, reply_markup=kb_test_detail_back())
+    if len(chunks) == 1:
+        await call.message.edit_text(chunks[0], reply_markup=kb_test_detail_back())
     else:
-        chunks = [detail_text[i:i + 4000] for i in range(0, len(detail_text), 4000)]
         await call.message.edit_text(chunks[0])
         for chunk in chunks[1:-1]:
             await call.message.answer(chunk)
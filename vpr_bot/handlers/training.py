@@ -2,22 +2,42 @@
 Single-task training mode handlers.
 """
 
+import asyncio
 import logging
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 
-from database import save_task_attempt
+from database import detach_connection, save_task_attempt
 from generator import generate_task, generate_theory
 from generator import evaluate_answer
 from keyboards import kb_after_theory, kb_task_result
 from states import VPRStates
+from ui import score_bar
 from vpr_data import VPR_STRUCTURE, get_task_type
 
 router = Router()
 logger = logging.getLogger(__name__)
 
+# Background tasks keep a strong reference here so the event loop cannot
+# garbage-collect them mid-flight.
+_bg_tasks: set[asyncio.Task] = set()
+
+
+async def _detached(coro):
+    # The spawned task inherits the handler's context — including its
+    # pinned DB connection, which the middleware releases as soon as the
+    # handler returns. Detach so queries here acquire their own.
+    detach_connection()
+    return await coro
+
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(_detached(coro))
+    _bg_tasks.add(task)
+    task.add_done_callback(_bg_tasks.discard)
+
 
 # ---------------------------------------------------------------------------
 # Select task type → generate task
@@ -108,10 +128,11 @@ async def receive_answer(message: Message, state: FSMContext) -> None:
     verdict = result["verdict"]
     explanation = result["explanation"]
 
-    # Save to DB
+    # Record the attempt off the critical path — a slow DB write should
+    # not delay the verdict the student is waiting for.
     task_type = get_task_type(grade, task_num)
-    try:
-        await save_task_attempt(
+    _spawn(
+        _save_attempt_bg(
             user_id=message.from_user.id,
             grade=grade,
             task_num=task_num,
@@ -123,21 +144,15 @@ async def receive_answer(message: Message, state: FSMContext) -> None:
             points_earned=points,
             points_max=max_points,
         )
-    except Exception as e:
-        logger.warning("save_task_attempt failed: %s", e)
+    )
 
     await wait_msg.delete()
 
-    # Score bar
-    filled = "🟩" * points
-    empty = "⬜" * (max_points - points)
-    score_bar = filled + empty
-
     result_text = (
         f"<b>{verdict}</b>\n\n"
         f"Твой ответ: <code>{user_answer}</code>\n"
         f"Правильный ответ: <code>{correct_answer}</code>\n\n"
-        f"Баллы: {score_bar} <b>{points}/{max_points}</b>\n\n"
+        f"Баллы: {score_bar(points, max_points)} <b>{points}/{max_points}</b>\n\n"
         f"💬 {explanation}"
     )
 
@@ -147,6 +162,13 @@ async def receive_answer(message: Message, state: FSMContext) -> None:
     )
 
 
+async def _save_attempt_bg(**kwargs) -> None:
+    try:
+        await save_task_attempt(**kwargs)
+    except Exception as e:
+        logger.warning("save_task_attempt failed: %s", e)
+
+
 # ---------------------------------------------------------------------------
 # Get theory
 # ---------------------------------------------------------------------------
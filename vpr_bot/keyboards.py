@@ -2,16 +2,23 @@
 Inline keyboard factories for VPR Bot.
 """
 
+from functools import lru_cache
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from vpr_data import SUPPORTED_GRADES, VPR_STRUCTURE
 
+# Keyboards below depend only on static VPR_STRUCTURE data (or on nothing
+# at all), and aiogram markup objects are never mutated after creation, so
+# each distinct keyboard is built once and the instance shared afterwards.
+
 
 # ---------------------------------------------------------------------------
 # Main menu
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
 def kb_grades() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     for grade in SUPPORTED_GRADES:
@@ -28,6 +35,7 @@ def kb_grades() -> InlineKeyboardMarkup:
 # Mode selection
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
 def kb_mode(grade: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="🎯 Тренировать задание", callback_data="mode:train")
@@ -42,6 +50,7 @@ def kb_mode(grade: int) -> InlineKeyboardMarkup:
 # Task-type selection
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
 def kb_task_types(grade: int) -> InlineKeyboardMarkup:
     data = VPR_STRUCTURE[grade]
     builder = InlineKeyboardBuilder()
@@ -59,6 +68,7 @@ def kb_task_types(grade: int) -> InlineKeyboardMarkup:
 # Task training — after evaluation
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
 def kb_task_result(task_num: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="💡 Получить теорию", callback_data=f"theory:{task_num}")
@@ -69,6 +79,7 @@ def kb_task_result(task_num: int) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def kb_after_theory(task_num: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="🔄 Ещё такое задание", callback_data=f"task:{task_num}")
@@ -82,6 +93,7 @@ def kb_after_theory(task_num: int) -> InlineKeyboardMarkup:
 # Test mode
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
 def kb_test_start() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="⏱ Начать на время", callback_data="test:timed")
@@ -91,6 +103,7 @@ def kb_test_start() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache(maxsize=512)
 def kb_test_answer_sent(current: int, total: int, mode: str) -> InlineKeyboardMarkup:
     """Shown after user sends answer in practice mode (with immediate feedback)."""
     builder = InlineKeyboardBuilder()
@@ -104,6 +117,7 @@ def kb_test_answer_sent(current: int, total: int, mode: str) -> InlineKeyboardMa
     return builder.as_markup()
 
 
+@lru_cache(maxsize=512)
 def kb_test_next(current: int, total: int) -> InlineKeyboardMarkup:
     """Shown after user sends answer in timed mode (no feedback)."""
     builder = InlineKeyboardBuilder()
@@ -126,6 +140,7 @@ def kb_test_results(session_id: int) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def kb_test_detail_back() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="🏠 В меню", callback_data="nav:mode")
@@ -136,6 +151,7 @@ def kb_test_detail_back() -> InlineKeyboardMarkup:
 # Statistics
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
 def kb_stats_main() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     for grade in SUPPORTED_GRADES:
@@ -146,6 +162,7 @@ def kb_stats_main() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def kb_stats_back() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="◀️ К статистике", callback_data="nav:stats")
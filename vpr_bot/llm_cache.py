@@ -0,0 +1,55 @@
+"""
+Exact-key cache for LLM responses.
+
+Theory texts are near-deterministic and overwhelmingly reused across
+users, so a cache hit replaces a multi-second OpenAI round-trip with a
+dictionary/SQL lookup. Entries live in the llm_cache table (see
+schema.sql) behind a small in-process LRU front; everything degrades to
+memory-only when the bot runs without a database.
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Optional
+
+import orjson
+
+import database
+
+logger = logging.getLogger(__name__)
+
+# In-process front cache — hot keys skip even the DB round-trip.
+_MEMORY_MAX = 512
+_memory: OrderedDict[str, str] = OrderedDict()
+
+
+def make_key(**parts: Any) -> str:
+    """Stable sha256 hex key over keyword parts (sorted before hashing)."""
+    return hashlib.sha256(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def _remember(key: str, value: str) -> None:
+    _memory[key] = value
+    _memory.move_to_end(key)
+    if len(_memory) > _MEMORY_MAX:
+        _memory.popitem(last=False)
+
+
+async def get(key: str) -> Optional[str]:
+    value = _memory.get(key)
+    if value is not None:
+        _memory.move_to_end(key)
+        return value
+    if not database.is_available():
+        return None
+    value = await database.get_llm_cache(key)
+    if value is not None:
+        _remember(key, value)
+    return value
+
+
+async def set(key: str, value: str, ttl_days: int = 30) -> None:
+    _remember(key, value)
+    if database.is_available():
+        await database.set_llm_cache(key, value, ttl_days)
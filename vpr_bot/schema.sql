@@ -57,3 +57,26 @@ CREATE TABLE IF NOT EXISTS tasks (
 );
 
 CREATE INDEX IF NOT EXISTS idx_tasks_grade_num ON tasks(grade, task_num);
+
+-- Pre-generated AI tasks waiting to be served (see generator.py)
+CREATE TABLE IF NOT EXISTS task_pool (
+    id              SERIAL PRIMARY KEY,
+    grade           INT NOT NULL,
+    task_num        INT NOT NULL,
+    topic           TEXT NOT NULL,
+    hint            TEXT NOT NULL,
+    task_text       TEXT NOT NULL,
+    correct_answer  TEXT NOT NULL,
+    solution        TEXT NOT NULL DEFAULT '',
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_pool_grade_num ON task_pool(grade, task_num);
+
+-- Exact-key cache for LLM responses (see llm_cache.py)
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key         TEXT PRIMARY KEY,   -- sha256 over model + prompt variables
+    value       TEXT NOT NULL,
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at  TIMESTAMPTZ NOT NULL
+);
@@ -88,6 +88,22 @@ class TestLowLevelHelpers:
         assert result == "INSERT 0 1"
         database._pool = None
 
+    @pytest.mark.asyncio
+    async def test_fetchval_uses_pinned_connection(self):
+        # Regression: inside handler_connection() the ContextVar holds a
+        # holder, not a connection — helpers must go through _ctx_conn().
+        pool, conn = make_fake_pool()
+        pool.acquire = AsyncMock(return_value=conn)
+        pool.release = AsyncMock()
+        conn.fetchval = AsyncMock(return_value=42)
+        database._pool = pool
+        async with database.handler_connection():
+            result = await database._fetchval("SELECT 1")
+        assert result == 42
+        conn.fetchval.assert_called_once_with("SELECT 1")
+        pool.release.assert_called_once_with(conn)
+        database._pool = None
+
     @pytest.mark.asyncio
     async def test_execute_handles_exception(self):
         pool, conn = make_fake_pool()
@@ -327,7 +343,7 @@ class TestCompleteTestSession:
         database._pool = None
 
     @pytest.mark.asyncio
-    async def test_tasks_serialized_as_json(self):
+    async def test_tasks_passed_to_jsonb_codec(self):
         pool, conn = make_fake_pool()
         database._pool = pool
         tasks = [{"task_num": 1, "user_answer": "42", "points": 2}]
@@ -335,12 +351,12 @@ class TestCompleteTestSession:
             session_id=1, total_score=2, max_score=2, grade_mark=5, tasks=tasks
         )
         call_args = conn.execute.call_args[0]
-        # The 4th positional arg should be a JSON string
+        # The 4th positional arg is the raw task list — the jsonb codec
+        # registered in init_db serializes it inside the driver
         json_arg = call_args[4]
-        assert isinstance(json_arg, str)
-        parsed = json.loads(json_arg)
-        assert parsed[0]["task_num"] == 1
-        assert parsed[0]["user_answer"] == "42"
+        assert json_arg is tasks
+        assert json_arg[0]["task_num"] == 1
+        assert json_arg[0]["user_answer"] == "42"
         database._pool = None
 
 
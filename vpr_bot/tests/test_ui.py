@@ -0,0 +1,131 @@
+"""
+Unit tests for ui.py presentation helpers:
+- score_bar / SCORE_BARS table
+- iter_html_chunks: HTML-safe pagination of long messages
+"""
+
+import re
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui import SCORE_BARS, iter_html_chunks, score_bar
+
+
+# ---------------------------------------------------------------------------
+# Score bars
+# ---------------------------------------------------------------------------
+
+class TestScoreBar:
+    def test_full_score(self):
+        assert score_bar(2, 2) == "🟩🟩"
+
+    def test_zero_score(self):
+        assert score_bar(0, 3) == "⬜⬜⬜"
+
+    def test_partial_score(self):
+        assert score_bar(1, 2) == "🟩⬜"
+
+    def test_table_matches_direct_construction(self):
+        for max_p, bars in SCORE_BARS.items():
+            for p, bar in enumerate(bars):
+                assert bar == "🟩" * p + "⬜" * (max_p - p)
+
+    def test_out_of_table_max_points(self):
+        # Defensive path for max_points beyond the precomputed table
+        assert score_bar(3, 7) == "🟩🟩🟩⬜⬜⬜⬜"
+
+
+# ---------------------------------------------------------------------------
+# HTML-safe pagination
+# ---------------------------------------------------------------------------
+
+def _make_detail_lines(n_tasks: int) -> list[str]:
+    """Lines shaped like show_test_detail's output."""
+    lines = [
+        "📋 <b>Подробный разбор — 7 класс</b>\n",
+        "Итого: 10/19 баллов · Оценка «3»\n",
+        "─" * 30,
+    ]
+    for i in range(1, n_tasks + 1):
+        lines.append(
+            f"\n✅ <b>№{i}</b> <i>Очень длинная тема задания номер {i} " + "x" * 200 + "</i>\n"
+            f"   Ответ: <code>{i * 13}</code> | Верно: <code>{i * 13}</code>\n"
+            f"   Баллы: 1/2"
+        )
+    return lines
+
+
+def _tag_counts(text: str) -> dict:
+    counts = {}
+    for m in re.finditer(r"</?(b|i|code)>", text):
+        tag = m.group(0)
+        counts[tag] = counts.get(tag, 0) + 1
+    return counts
+
+
+class TestIterHtmlChunks:
+    def test_short_input_single_chunk(self):
+        lines = ["<b>Заголовок</b>", "строка", "ещё строка"]
+        chunks = list(iter_html_chunks(lines))
+        assert chunks == ["\n".join(lines)]
+
+    def test_long_input_splits_under_telegram_limit(self):
+        lines = _make_detail_lines(40)
+        assert len("\n".join(lines)) > 8000
+        chunks = list(iter_html_chunks(lines, limit=3900))
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert len(chunk) <= 4096
+
+    def test_every_chunk_has_balanced_tags(self):
+        chunks = list(iter_html_chunks(_make_detail_lines(40), limit=3900))
+        for chunk in chunks:
+            counts = _tag_counts(chunk)
+            for tag in ("b", "i", "code"):
+                assert counts.get(f"<{tag}>", 0) == counts.get(f"</{tag}>", 0), chunk
+
+    def test_splits_only_between_lines(self):
+        lines = _make_detail_lines(40)
+        chunks = list(iter_html_chunks(lines, limit=3900))
+        # Text content (tags stripped) must survive pagination intact
+        strip = lambda s: re.sub(r"</?(b|i|code)>", "", s)
+        assert strip("\n".join(chunks)) == strip("\n".join(lines))
+
+    def test_oversize_line_is_hard_split(self):
+        # A single element longer than the limit (e.g. a 4500-char user
+        # answer) must be split inside the line, not emitted as-is
+        lines = ["<b>Ответ:</b> <code>" + "7" * 4500 + "</code>"]
+        chunks = list(iter_html_chunks(lines, limit=1000))
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert len(chunk) <= 1024  # limit + re-balancing-tag slack
+            counts = _tag_counts(chunk)
+            for tag in ("b", "i", "code"):
+                assert counts.get(f"<{tag}>", 0) == counts.get(f"</{tag}>", 0), chunk
+        strip = lambda s: re.sub(r"</?(b|i|code)>", "", s)
+        assert strip("".join(chunks)) == strip(lines[0])
+
+    def test_oversize_line_among_normal_lines_stays_under_cap(self):
+        lines = _make_detail_lines(3)
+        lines.insert(3, "   Ответ: <code>" + "9" * 4500 + "</code>")
+        chunks = list(iter_html_chunks(lines, limit=3900))
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert len(chunk) <= 4096
+            counts = _tag_counts(chunk)
+            for tag in ("b", "i", "code"):
+                assert counts.get(f"<{tag}>", 0) == counts.get(f"</{tag}>", 0), chunk
+
+    def test_tag_reopened_across_boundary(self):
+        # One <i> spanning many lines must be closed at each seam and
+        # reopened on the next chunk
+        lines = ["<i>курсив начался"] + ["строка " + "y" * 100 for _ in range(100)] + ["конец</i>"]
+        chunks = list(iter_html_chunks(lines, limit=1000))
+        assert len(chunks) > 1
+        for chunk in chunks:
+            counts = _tag_counts(chunk)
+            assert counts.get("<i>", 0) == counts.get("</i>", 0), chunk
+        assert chunks[0].endswith("</i>")
+        assert chunks[1].startswith("<i>")
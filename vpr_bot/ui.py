@@ -0,0 +1,83 @@
+"""
+Shared presentation helpers for handlers.
+"""
+
+import re
+from typing import Iterable, Iterator
+
+# Every score bar a task can produce, built once at import:
+# SCORE_BARS[max_points][points] -> "🟩🟩⬜". VPR tasks award at most a
+# few points, so the whole table is a handful of short strings.
+SCORE_BARS = {
+    max_p: tuple("🟩" * p + "⬜" * (max_p - p) for p in range(max_p + 1))
+    for max_p in range(1, 6)
+}
+
+
+def score_bar(points: int, max_points: int) -> str:
+    bars = SCORE_BARS.get(max_points)
+    if bars is None or not 0 <= points <= max_points:
+        # Out-of-table values (defensive; evaluator clamps points)
+        return "🟩" * points + "⬜" * (max_points - points)
+    return bars[points]
+
+
+# The simple paired tags this bot's HTML messages use.
+_TAG_RE = re.compile(r"</?(b|i|code)>")
+
+
+def _track_tags(open_tags: list[str], text: str) -> None:
+    """Update the open-tag stack with the tags seen in ``text``."""
+    for m in _TAG_RE.finditer(text):
+        tag = m.group(1)
+        if m.group(0).startswith("</"):
+            for i in range(len(open_tags) - 1, -1, -1):
+                if open_tags[i] == tag:
+                    del open_tags[i]
+                    break
+        else:
+            open_tags.append(tag)
+
+
+def iter_html_chunks(lines: Iterable[str], limit: int = 4000) -> Iterator[str]:
+    """Yield newline-joined chunks of ~``limit`` chars, splitting between
+    lines and keeping <b>/<i>/<code> balanced in every chunk.
+
+    A tag left open at a chunk boundary is closed before the yield and
+    reopened at the start of the next chunk, so Telegram parses each
+    message independently. A single line longer than ``limit`` — e.g. a
+    user answer echoed into the detail view — is force-split inside the
+    line with the same close/reopen treatment at the seam. ``limit``
+    should leave slack under the 4096 hard cap for those re-balancing
+    tags.
+    """
+    buf: list[str] = []
+    size = 0
+    open_tags: list[str] = []  # tags left open by text already in buf
+
+    for line in lines:
+        prefix = ""
+        if buf and size + len(line) + 1 > limit:
+            yield "\n".join(buf) + "".join(f"</{t}>" for t in reversed(open_tags))
+            buf = []
+            size = 0
+            prefix = "".join(f"<{t}>" for t in open_tags)
+        while len(prefix) + len(line) > limit:
+            # The line alone exceeds the budget: force a seam inside it.
+            cut = limit - len(prefix)
+            # Never cut through the middle of a tag.
+            lt = line.rfind("<", 0, cut)
+            if lt > 0 and line.find(">", lt, cut) == -1:
+                cut = lt
+            head, line = line[:cut], line[cut:]
+            _track_tags(open_tags, head)
+            yield prefix + head + "".join(f"</{t}>" for t in reversed(open_tags))
+            prefix = "".join(f"<{t}>" for t in open_tags)
+        # Track the stack against the original line — the reopening
+        # prefix must not be counted twice.
+        _track_tags(open_tags, line)
+        text = prefix + line
+        buf.append(text)
+        size += len(text) + 1
+    if buf:
+        yield "\n".join(buf) + "".join(f"</{t}>" for t in reversed(open_tags))
@@ -3,6 +3,8 @@ Hardcoded VPR (Всероссийская проверочная работа) s
 All task counts, time limits, grading criteria are fixed per official guidelines.
 """
 
+from functools import lru_cache
+
 # Each grading entry: (mark, min_score, max_score)
 VPR_STRUCTURE = {
     4: {
@@ -309,6 +311,10 @@ def get_grade_data(grade: int) -> dict:
     return VPR_STRUCTURE[grade]
 
 
+# VPR_STRUCTURE is static for the process lifetime, so the linear scans
+# below are memoized — they run on every answer and every task render.
+
+@lru_cache(maxsize=None)
 def get_task_type(grade: int, task_num: int) -> dict:
     data = VPR_STRUCTURE[grade]
     for t in data["task_types"]:
@@ -317,6 +323,7 @@ def get_task_type(grade: int, task_num: int) -> dict:
     raise ValueError(f"Task {task_num} not found for grade {grade}")
 
 
+@lru_cache(maxsize=None)
 def calculate_grade(grade: int, score: int) -> int:
     """Return mark (2–5) based on score."""
     data = VPR_STRUCTURE[grade]
@@ -326,5 +333,8 @@ def calculate_grade(grade: int, score: int) -> int:
     return 2
 
 
+_GRADE_EMOJI = {5: "🌟", 4: "✅", 3: "📗", 2: "❌"}
+
+
 def grade_emoji(mark: int) -> str:
-    return {5: "🌟", 4: "✅", 3: "📗", 2: "❌"}.get(mark, "❓")
+    return _GRADE_EMOJI.get(mark, "❓")